@@ -0,0 +1,57 @@
+import gameplay
+import game_io
+
+
+def first_arena(players, gameboard=None):
+    if len(players) != 2:
+        raise Exception("Exactly two players required.  Found " +
+                        str(len(players)) + ".")
+    
+    if gameboard == None:
+        gameboard = gameplay.Gameboard(squares=dict())
+    mothership_one = None
+    mothership_two = None
+    player_one = None
+    player_two = None
+    for player in players:
+        if player.player_number == 1:
+            player_one = player
+            mothership_one = gameplay.get_mothership(player)
+        if player.player_number == 2:
+            player_two = player
+            mothership_two = gameplay.get_mothership(player)
+
+    if not all([variable != None for variable in [mothership_one,
+                                                  mothership_two,
+                                                  player_one,
+                                                  player_two]]):
+        raise Exception("Player or mothership not found.")
+
+    mothership_one.coords = (4, 15)
+    mothership_two.coords = (35, 15)
+    gameboard.add_to_board(mothership_one)
+    gameboard.add_to_board(mothership_two)
+
+    for x in range(4, 6):
+        for y in range(4, 6):            
+            resource = game_io.resource_pile_factory((x, y), 25)
+            gameboard.add_to_board(resource)
+    for x in range(35, 37):
+        for y in range(24, 26):            
+            resource = game_io.resource_pile_factory((x, y), 50)
+            gameboard.add_to_board(resource)
+    for x in range(4, 6):
+        for y in range(24, 26):            
+            resource = game_io.resource_pile_factory((x, y), 25)
+            gameboard.add_to_board(resource)
+    for x in range(35, 37):
+        for y in range(24, 26):            
+            resource = game_io.resource_pile_factory((x, y), 50)
+            gameboard.add_to_board(resource)
+    for x in range(20, 26):
+        for y in range(13,17):            
+            resource = game_io.resource_pile_factory((x, y), 90)
+            gameboard.add_to_board(resource)
+    
+
+    return gameplay.Gamestate(gameboard=gameboard, players=players)
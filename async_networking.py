@@ -0,0 +1,234 @@
+'''
+asyncio implementation of the client and host transports.  It speaks the same
+netstring framed MessageContainers as networking.py and host_game.py, so
+asyncio and Twisted clients and hosts can be mixed freely.  Run a host with
+
+    python async_networking.py --port 8007
+'''
+import sys
+import asyncio
+import argparse
+
+import messages
+import server_state
+import wire
+
+RESPONSE_TIMEOUT = 30 # seconds
+MAX_NETSTRING_LENGTH = 2**26
+
+'''
+return the data of the next netstring, raising asyncio.IncompleteReadError
+once the stream ends
+'''
+async def read_netstring(reader):
+    length = await reader.readuntil(b":")
+    if not length[:-1].isdigit() or int(length[:-1]) > MAX_NETSTRING_LENGTH:
+        raise Exception("Invalid netstring length " + repr(length[:-1]) + ".")
+    data = await reader.readexactly(int(length[:-1]) + 1)
+    if data[-1:] != b",":
+        raise Exception("Netstring is missing its trailing comma.")
+    return data[:-1]
+
+def write_netstring(writer, data):
+    writer.write(wire.netstring(data))
+
+
+### client ###
+
+class PendingRequest:
+    def __init__(self, request_id, request, future):
+        self.request_id = request_id
+        self.request = request # the encoded message
+        self.response = None
+        self.future = future # resolves to the response
+
+    def resolve(self, response):
+        self.response = response
+        if self.future.done():
+            return
+        if isinstance(response, messages.ErrorResponse):
+            self.future.set_exception(Exception(
+                "The host could not handle the request: " + response.error))
+        else:
+            self.future.set_result(response)
+
+class AsyncServerConnection:
+    '''
+    asyncio counterpart of networking.ServerConnection: one long-lived
+    connection shared by every request, matched to responses by request id,
+    reconnecting with backoff and resending unanswered requests.  Must be
+    created while the event loop is running.
+    '''
+    def __init__(self,
+                 host,
+                 port,
+                 max_retry_delay=5,
+                 wire_format="jsons",
+                 match_id=None):
+        self.host = host
+        self.port = port
+        self.wire_format = wire_format
+        self.match_id = match_id # sent with every request
+        self.max_retry_delay = max_retry_delay
+        self.next_request_id = 0
+        self.pending_requests = dict() # request id to PendingRequest
+        self.writer = None
+        self.closed = False
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def run(self):
+        retry_delay = 0.1
+        while not self.closed:
+            try:
+                reader, writer = await asyncio.open_connection(self.host,
+                                                               self.port)
+            except OSError:
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, self.max_retry_delay)
+                continue
+            retry_delay = 0.1
+            self.writer = writer
+            for pending_request in self.pending_requests.values():
+                write_netstring(writer, pending_request.request)
+            try:
+                while True:
+                    data = await read_netstring(reader)
+                    self.response_received(*wire.decode_message(data)[:2])
+            except (asyncio.IncompleteReadError, OSError):
+                pass
+            finally:
+                self.writer = None
+                writer.close()
+
+    def response_received(self, response_container, response):
+        pending_request = self.pending_requests.pop(
+            response_container.request_id, None)
+        if pending_request != None:
+            pending_request.resolve(response)
+
+    '''
+    return a PendingRequest whose response is set once the host answers
+    '''
+    def send(self, message):
+        request_id = self.next_request_id
+        self.next_request_id += 1
+        encoded_message = wire.encode_message(message,
+                                              request_id,
+                                              self.wire_format,
+                                              self.match_id)
+        future = asyncio.get_running_loop().create_future()
+        pending_request = PendingRequest(request_id, encoded_message, future)
+        self.pending_requests[request_id] = pending_request
+        if self.writer != None:
+            write_netstring(self.writer, encoded_message)
+        return pending_request
+
+    async def wait_for_response(self, message, timeout=RESPONSE_TIMEOUT):
+        pending_request = self.send(message)
+        try:
+            return await asyncio.wait_for(pending_request.future, timeout)
+        except asyncio.TimeoutError:
+            self.pending_requests.pop(pending_request.request_id, None)
+            raise Exception("No response to " + message.message_type() +
+                            " from host " + self.host + ":" +
+                            str(self.port) + " within " + str(timeout) +
+                            " seconds.")
+
+    async def close(self):
+        self.closed = True
+        if self.writer != None:
+            self.writer.close()
+        await self.task
+
+
+### host ###
+
+async def handle_client(lobby, reader, writer):
+    try:
+        while True:
+            handle_request(lobby, await read_netstring(reader), writer)
+    except (asyncio.IncompleteReadError, OSError):
+        pass
+    finally:
+        writer.close()
+
+'''
+like host_game.HostProtocol.stringReceived, answer a request the host cannot
+handle with an ErrorResponse and keep the connection
+'''
+def handle_request(lobby, data, writer):
+    request_id = None
+    match_id = None
+    wire_format = wire.wire_format_of(data)
+
+    def reply(response_body):
+        if not writer.is_closing():
+            write_netstring(writer,
+                            wire.encode_message(response_body,
+                                                request_id,
+                                                wire_format,
+                                                match_id))
+
+    try:
+        message_container, message, wire_format = wire.decode_message(
+            data,
+            decode_turns=False)
+        request_id = message_container.request_id
+        match_id = message_container.match_id
+        server = lobby.match(match_id, create=message.opens_match())
+        match_id = server.match_id
+        message.respond_on_server(server, reply)
+    except Exception as error:
+        reply(messages.ErrorResponse(error=str(error)))
+
+'''
+return a started asyncio.Server hosting the matches of lobby, a
+server_state.Lobby
+'''
+async def start_host(lobby, host=None, port=8007):
+    return await asyncio.start_server(
+        lambda reader, writer: handle_client(lobby, reader, writer),
+        host,
+        port)
+
+async def free_idle_matches(lobby, max_idle_seconds):
+    while True:
+        await asyncio.sleep(max_idle_seconds / 10)
+        lobby.free_idle_matches(max_idle_seconds)
+
+async def serve(host,
+                port,
+                hot_turns=server_state.HOT_TURNS,
+                turn_log_directory=None,
+                max_idle_seconds=server_state.MAX_IDLE_SECONDS):
+    lobby = server_state.Lobby(turn_log_directory, hot_turns)
+    asyncio_server = await start_host(lobby, host, port)
+    freeing = asyncio.create_task(free_idle_matches(lobby, max_idle_seconds))
+    try:
+        async with asyncio_server:
+            await asyncio_server.serve_forever()
+    finally:
+        freeing.cancel()
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description="Host a game over asyncio.")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=8007)
+    parser.add_argument("--hot-turns", type=int,
+                        default=server_state.HOT_TURNS,
+                        help="turns per match kept in memory")
+    parser.add_argument("--turn-log-directory", default=None,
+                        help="where older turns are kept, default temp files")
+    parser.add_argument("--max-idle-seconds", type=float,
+                        default=server_state.MAX_IDLE_SECONDS,
+                        help="free matches idle for this long")
+    options = parser.parse_args(arguments)
+    asyncio.run(serve(options.host,
+                      options.port,
+                      options.hot_turns,
+                      options.turn_log_directory,
+                      options.max_idle_seconds))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,352 @@
+'''
+Benchmarks for the turn resolver, board operations, serialization and UI
+text rendering, run on synthetic gamestates of growing size, e.g.
+
+    python benchmark.py --sizes 10 50 200 --output results.jsonl
+
+Every result is printed, and with --output also appended as one JSON object
+per line tagged with the current git commit, so runs can be compared
+across commits.  "python benchmark.py --boards" compares the board
+backends on crowded boards instead.
+'''
+import sys
+import json
+import time
+import random
+import copy
+import argparse
+import platform
+import subprocess
+import statistics
+
+import gameplay
+import game_io
+import headless
+import messages
+
+
+def crowded_gamestate(gameboard, unit_count, seed, resource_density=0.2):
+    rng = random.Random(seed)
+    players = headless.load_players(["monsters_1", "test_team_1"], seed)
+
+    for x in range(gameplay.BOARD_WIDTH):
+        for y in range(gameplay.BOARD_HEIGHT):
+            if rng.random() < resource_density:
+                amount = rng.randrange(10, 100)
+                resource = game_io.resource_pile_factory((x, y), amount)
+                gameboard.add_to_board(resource)
+
+    placed = 0
+    while placed < unit_count:
+        player = players[placed % len(players)]
+        prototype = rng.choice(player.unit_prototypes)
+        unit = copy.deepcopy(prototype)
+        unit.set_owner(player)
+        unit.evolve_uuid(rng.getrandbits(64))
+        for part in unit.parts:
+            part.evolve_uuid(rng.getrandbits(64))
+        unit.coords = (rng.randrange(gameplay.BOARD_WIDTH),
+                       rng.randrange(gameplay.BOARD_HEIGHT))
+        if (gameplay.unit_placement_in_bounds(unit.coords, unit.size) and
+            not gameboard.adding_would_cause_conflict(unit)):
+            gameboard.add_to_board(unit)
+            placed += 1
+
+    return gameplay.Gamestate(gameboard=gameboard, players=players)
+
+'''
+every unit fires up its cores, collects and tries to move somewhere random,
+which makes for plenty of collisions on a crowded board
+'''
+def crowded_turn(gamestate, rng):
+    turn = gameplay.build_gameturn(gamestate.players)
+    players = {p.player_number: p for p in gamestate.players}
+    units = gamestate.gameboard.units()
+    for unit in sorted(units, key=lambda unit: int(unit.uuid)):
+        player = players[unit.owner_player_number]
+        for part in unit.parts:
+            if part.is_collector():
+                action = gameplay.collector_action_factory()
+                turn.add_action(player, unit, part, action)
+            elif part.is_locomotor():
+                shape = gameplay.shape_enum_to_object(part.shape_type)
+                squares = [square for path in shape.move_paths(unit.coords,
+                                                               part.size,
+                                                               unit.size)
+                           for square in path]
+                if len(squares) > 0:
+                    target = rng.choice(squares)
+                    delta = (target[0] - unit.coords[0],
+                             target[1] - unit.coords[1])
+                    action = gameplay.locomotor_action_factory(delta)
+                    turn.add_action(player, unit, part, action)
+    return turn
+
+def random_turns(gamestate, seed):
+    rng = random.Random(seed)
+    return [headless.random_turn(gamestate, player, rng)
+            for player in gamestate.players]
+
+def action_count(turn):
+    return sum(len(part_dict)
+               for unit_dict in turn.players_to_units_to_parts_to_actions.values()
+               for part_dict in unit_dict.values())
+
+def time_turns(gamestate, turns, seed):
+    rng = random.Random(seed)
+    elapsed = 0
+    for i in range(turns):
+        turn = crowded_turn(gamestate, rng)
+        start = time.perf_counter()
+        gameplay.advance_gamestate_via_mutation(gamestate, turn)
+        elapsed += time.perf_counter() - start
+    return elapsed / turns
+
+def rebuild_on(gamestate, gameboard):
+    gamestate = copy.deepcopy(gamestate)
+    for placeable in gamestate.gameboard.placeables():
+        gameboard.add_to_board(placeable)
+    gamestate.gameboard = gameboard
+    return gamestate
+
+def benchmark_gameboards(unit_counts, turns, seed=0):
+    for unit_count in unit_counts:
+        starting_gamestate = crowded_gamestate(gameplay.Gameboard(squares=dict()),
+                                               unit_count,
+                                               seed)
+        results = []
+        for board_factory in [lambda: gameplay.Gameboard(squares=dict()),
+                              gameplay.ArrayGameboard]:
+            gamestate = rebuild_on(starting_gamestate, board_factory())
+            results.append(time_turns(gamestate, turns, seed))
+        print("%4d units: dict %8.3f ms/turn, array %8.3f ms/turn" %
+              (unit_count, results[0]*1000, results[1]*1000))
+
+
+### suite ###
+
+'''
+run operation(setup()) repeat times and return the per-operation times,
+where each run performs operations operations
+'''
+def timed(setup, operation, repeat, operations=1):
+    times = []
+    for i in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        operation(argument)
+        times.append((time.perf_counter() - start) / operations)
+    return times
+
+def bench_advance(gamestate, repeat):
+    def setup():
+        state = copy.deepcopy(gamestate)
+        return (state, gameplay.merge_turns(random_turns(state, 0)))
+    return timed(setup,
+                 lambda argument: gameplay.advance_gamestate_via_mutation(
+                     *argument),
+                 repeat)
+
+def bench_add_remove(gamestate, repeat):
+    placeables = gamestate.gameboard.placeables()
+
+    def cycle(gameboard):
+        for placeable in placeables:
+            gameboard.remove_from_board(placeable)
+        for placeable in placeables:
+            gameboard.add_to_board(placeable)
+
+    return timed(lambda: gamestate.gameboard, cycle, repeat,
+                 operations=2*len(placeables))
+
+def bench_conflicts_exist(gamestate, repeat):
+    def check(gameboard):
+        for i in range(100):
+            gameboard.conflicts_exist()
+    return timed(lambda: gamestate.gameboard, check, repeat, operations=100)
+
+def bench_merge_turns(gamestate, repeat):
+    turns = random_turns(gamestate, 0)
+    return timed(lambda: turns, gameplay.merge_turns, repeat)
+
+def bench_align_net_objects(gamestate, repeat):
+    # turns come off the wire holding copies of the gamestate's objects
+    foreign_turn = copy.deepcopy(gameplay.merge_turns(random_turns(gamestate,
+                                                                   0)))
+    return timed(lambda: copy.copy(foreign_turn),
+                 lambda turn: turn.align_net_objects(gamestate),
+                 repeat)
+
+def bench_deepcopy(gamestate, repeat):
+    return timed(lambda: gamestate, copy.deepcopy, repeat)
+
+def bench_jsons_dumps(gamestate, repeat):
+    import jsons
+    return timed(lambda: gamestate,
+                 lambda state: jsons.dumps(state, strip_privates=True),
+                 repeat)
+
+def bench_jsons_loads(gamestate, repeat):
+    import jsons
+    dumped = jsons.dumps(gamestate, strip_privates=True)
+    return timed(lambda: dumped,
+                 lambda string: jsons.loads(string, cls=gameplay.Gamestate),
+                 repeat)
+
+'''
+the strings MouseoverWindow.draw_unit_info renders for each unit on the
+board, one list per unit as if each were moused over for one frame
+'''
+def unit_info_strings(gamestate):
+    return [["Energy: "] + [string for part in unit.parts
+                           for string in [str(part.size),
+                                          "%6.2f" % (part.quality),
+                                          part.display_name(),
+                                          str(part.max_hp()-part.damage) +
+                                          "/" + str(part.max_hp())]]
+            for unit in gamestate.gameboard.units()]
+
+def text_benchmark(render):
+    def bench_text(gamestate, repeat):
+        import game
+        frames = unit_info_strings(gamestate)
+
+        def draw_frames(frames):
+            for strings in frames:
+                for string in strings:
+                    render(game, string)
+
+        return timed(lambda: frames, draw_frames, repeat,
+                     operations=len(frames))
+    return bench_text
+
+def start_message(gamestate):
+    return messages.GameStartPollResponse(gamestate=gamestate)
+
+def wire_benchmarks(wire_format):
+    def bench_encode(gamestate, repeat):
+        import wire
+        return timed(lambda: start_message(gamestate),
+                     lambda message: wire.encode_message(message,
+                                                         0,
+                                                         wire_format),
+                     repeat)
+
+    def bench_decode(gamestate, repeat):
+        import wire
+        encoded = wire.encode_message(start_message(gamestate), 0, wire_format)
+        return timed(lambda: encoded, wire.decode_message, repeat)
+
+    return (bench_encode, bench_decode)
+
+def wire_size(wire_format):
+    def size(gamestate):
+        import wire
+        return len(wire.encode_message(start_message(gamestate),
+                                       0,
+                                       wire_format))
+    return size
+
+BENCHMARKS = {"advance_gamestate_via_mutation": bench_advance,
+              "add_remove": bench_add_remove,
+              "conflicts_exist": bench_conflicts_exist,
+              "merge_turns": bench_merge_turns,
+              "align_net_objects": bench_align_net_objects,
+              "deepcopy_gamestate": bench_deepcopy,
+              "jsons_dumps": bench_jsons_dumps,
+              "jsons_loads": bench_jsons_loads,
+              # per frame of unit info text, straight from the font or cached
+              "text_render_font": text_benchmark(
+                  lambda game, string: game.DEFAULT_FONT.render(
+                      string, False, (255, 255, 255))),
+              "text_render_cached": text_benchmark(
+                  lambda game, string: game.render_text(string,
+                                                        (255, 255, 255))),}
+# the message with the whole starting gamestate, in each wire format
+for wire_format in ["jsons", "binary"]:
+    encode_benchmark, decode_benchmark = wire_benchmarks(wire_format)
+    BENCHMARKS["wire_encode_" + wire_format] = encode_benchmark
+    BENCHMARKS["wire_decode_" + wire_format] = decode_benchmark
+
+# benchmark name to size(gamestate), the size in bytes of what it handles
+PAYLOAD_SIZES = {"wire_" + direction + "_" + wire_format:
+                 wire_size(wire_format)
+                 for direction in ["encode", "decode"]
+                 for wire_format in ["jsons", "binary"]}
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True,
+                              text=True).stdout.strip()
+    except OSError:
+        return None
+
+def run_suite(sizes, board_names, names, repeat, seed):
+    commit = git_commit()
+    for size in sizes:
+        for board_name in board_names:
+            gamestate = crowded_gamestate(headless.BOARDS[board_name](),
+                                          size,
+                                          seed)
+            actions = action_count(gameplay.merge_turns(
+                random_turns(gamestate, 0)))
+            for name in names:
+                try:
+                    times = BENCHMARKS[name](gamestate, repeat)
+                    payload_size = (PAYLOAD_SIZES[name](gamestate)
+                                    if name in PAYLOAD_SIZES else None)
+                except ImportError as error:
+                    print("skipping " + name + ": " + str(error),
+                          file=sys.stderr)
+                    continue
+                yield {"benchmark": name,
+                       "board": board_name,
+                       "units": size,
+                       "resource_piles": sum(
+                           1 for placeable in gamestate.gameboard.placeables()
+                           if placeable.is_resource_pile()),
+                       "actions_per_turn": actions,
+                       "repeat": repeat,
+                       "min_seconds": min(times),
+                       "median_seconds": statistics.median(times),
+                       "bytes": payload_size,
+                       "commit": commit,
+                       "python": platform.python_version(),}
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description="Run benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10, 50, 100, 200])
+    parser.add_argument("--board", nargs="+", default=["dict", "array"],
+                        choices=sorted(headless.BOARDS))
+    parser.add_argument("--only", nargs="+", default=sorted(BENCHMARKS),
+                        choices=sorted(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="append JSON lines to this file")
+    parser.add_argument("--boards", action="store_true",
+                        help="only compare board backends per turn")
+    options = parser.parse_args(arguments)
+
+    if options.boards:
+        benchmark_gameboards(options.sizes, options.repeat, options.seed)
+        return
+
+    output = open(options.output, "a") if options.output else None
+    for result in run_suite(options.sizes, options.board, options.only,
+                            options.repeat, options.seed):
+        print("%-32s %-5s %4d units %12.3f us %10s" %
+              (result["benchmark"], result["board"], result["units"],
+               result["min_seconds"] * 1e6,
+               "" if result["bytes"] == None else
+               str(result["bytes"]) + " B"))
+        if output != None:
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    if output != None:
+        output.close()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,353 @@
+'''
+Compact binary encoding of messages and the gameplay objects they carry.
+The layout of every class follows its dataclass fields and their type
+annotations, so no per-class code is needed:
+
+    int           zigzag varint
+    float         8 byte big-endian double
+    str           varint byte length, then utf-8
+    UUID          16 bytes
+    Enum          the value, as an int
+    Tuple/List    items in order, Lists preceded by a varint count
+    Dict          varint count, then key and value pairs
+    Optional      one byte, 0 for None or 1 followed by the value
+    dataclasses   varint class code from CLASSES, then the fields in order
+
+Gameboards are encoded as their placeables in registry order and rebuilt
+with add_to_board, instead of once per covered square.  Classes can bring
+their own encoding through encode_with, as wire.py does for Gameturn.
+'''
+import struct
+
+from dataclasses import fields
+from enum import Enum
+from typing import get_type_hints, get_origin, get_args, Union
+from uuid import UUID
+
+import gameplay
+import messages
+
+DOUBLE = struct.Struct(">d")
+
+# every encodable class, coded by position; only ever append to this list so
+# the codes of existing classes stay the same
+CLASSES = [gameplay.Gamestate,
+           gameplay.Gameboard,
+           gameplay.ArrayGameboard,
+           gameplay.Player,
+           gameplay.Unit,
+           gameplay.ResourcePile,
+           gameplay.Wall,
+           gameplay.Producer,
+           gameplay.EnergyCore,
+           gameplay.Researcher,
+           gameplay.Armament,
+           gameplay.Collector,
+           gameplay.Locomotor,
+           gameplay.Armor,
+           gameplay.ProducerAction,
+           gameplay.ResearcherAction,
+           gameplay.ArmamentAction,
+           gameplay.CollectorAction,
+           gameplay.LocomotorAction,
+           gameplay.Gameturn,
+           messages.WelcomeRequest,
+           messages.WelcomeResponse,
+           messages.StartGameRequest,
+           messages.StartGameResponse,
+           messages.GameStartPollRequest,
+           messages.GameStartPollResponse,
+           messages.ReportTurnRequest,
+           messages.ReportTurnResponse,
+           messages.TurnPollRequest,
+           messages.TurnPollResponse,
+           messages.TurnSubscribeRequest,
+           messages.TurnSubscribeResponse,
+           gameplay.ProducerActionReference,
+           gameplay.ActionReference,
+           gameplay.GameturnReference,
+           messages.ErrorResponse,]
+CLASS_CODES = {cls: code for code, cls in enumerate(CLASSES)}
+BOARD_CLASSES = [gameplay.Gameboard, gameplay.ArrayGameboard]
+
+
+### primitives: write_x(value, out), read_x(data, offset) -> (value, offset) ###
+
+def write_int(value, out):
+    if type(value) is not int:
+        raise Exception("Expected an int, got " + repr(value) + ".")
+    value = value*2 if value >= 0 else -value*2 - 1
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_int(data, offset):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return ((result >> 1) ^ -(result & 1), offset)
+
+def write_float(value, out):
+    out += DOUBLE.pack(value)
+
+def read_float(data, offset):
+    return (DOUBLE.unpack_from(data, offset)[0], offset + DOUBLE.size)
+
+def write_bool(value, out):
+    out.append(1 if value else 0)
+
+def read_bool(data, offset):
+    return (data[offset] != 0, offset + 1)
+
+def write_str(value, out):
+    encoded = value.encode("utf-8")
+    write_int(len(encoded), out)
+    out += encoded
+
+def read_str(data, offset):
+    length, offset = read_int(data, offset)
+    end = offset + length
+    return (bytes(data[offset:end]).decode("utf-8"), end)
+
+def write_uuid(value, out):
+    out += value.bytes
+
+def read_uuid(data, offset):
+    return (UUID(bytes=bytes(data[offset:offset+16])), offset + 16)
+
+
+### objects ###
+
+def write_object(value, out):
+    code = CLASS_CODES.get(type(value), None)
+    if code == None:
+        raise Exception("No binary encoding for " + type(value).__name__ + ".")
+    write_int(code, out)
+    object_writer(type(value))(value, out)
+
+def read_object(data, offset):
+    code, offset = read_int(data, offset)
+    if not (0 <= code < len(CLASSES)):
+        raise Exception("Unknown class code " + str(code) + ".")
+    return object_reader(CLASSES[code])(data, offset)
+
+object_writers = dict()
+object_readers = dict()
+
+def object_writer(cls):
+    if cls not in object_writers:
+        if cls in BOARD_CLASSES:
+            object_writers[cls] = write_board
+        else:
+            hints = get_type_hints(cls)
+            field_writers = [(field.name, writer_for(hints[field.name]))
+                             for field in fields(cls)]
+
+            def write_fields(value, out):
+                for name, writer in field_writers:
+                    writer(getattr(value, name), out)
+
+            object_writers[cls] = write_fields
+    return object_writers[cls]
+
+def object_reader(cls):
+    if cls not in object_readers:
+        if cls in BOARD_CLASSES:
+            object_readers[cls] = lambda data, offset: read_board(cls,
+                                                                  data,
+                                                                  offset)
+        else:
+            hints = get_type_hints(cls)
+            field_readers = [reader_for(hints[field.name])
+                             for field in fields(cls)]
+
+            def read_fields(data, offset):
+                values = []
+                for reader in field_readers:
+                    value, offset = reader(data, offset)
+                    values.append(value)
+                return (cls(*values), offset)
+
+            object_readers[cls] = read_fields
+    return object_readers[cls]
+
+'''
+encode instances of cls with writer(value, out) under the class code of
+code_class, whose encoded instances are decoded with reader(data, offset)
+'''
+def encode_with(cls, code_class, writer, reader):
+    CLASS_CODES[cls] = CLASS_CODES[code_class]
+    object_writers[cls] = writer
+    object_readers[code_class] = reader
+
+def write_board(gameboard, out):
+    placeables = gameboard.placeables()
+    write_int(len(placeables), out)
+    for placeable in placeables:
+        write_object(placeable, out)
+
+def read_board(cls, data, offset):
+    gameboard = cls()
+    count, offset = read_int(data, offset)
+    for i in range(count):
+        placeable, offset = read_object(data, offset)
+        gameboard.add_to_board(placeable)
+    return (gameboard, offset)
+
+
+### annotations to writers and readers ###
+
+PRIMITIVES = {int: (write_int, read_int),
+              float: (write_float, read_float),
+              bool: (write_bool, read_bool),
+              str: (write_str, read_str),
+              UUID: (write_uuid, read_uuid),}
+
+'''
+return (writer, reader) for values of the annotated type
+'''
+def codec_for(annotation):
+    if annotation in PRIMITIVES:
+        return PRIMITIVES[annotation]
+    origin = get_origin(annotation)
+    arguments = get_args(annotation)
+
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return (lambda value, out: write_int(value.value, out),
+                lambda data, offset: enum_from_int(annotation, data, offset))
+
+    if origin is Union and type(None) in arguments:
+        others = [argument for argument in arguments
+                  if argument is not type(None)]
+        inner = (codec_for(others[0]) if len(others) == 1
+                 else (write_object, read_object))
+        return optional_codec(*inner)
+
+    if origin is Union:
+        return (write_object, read_object)
+
+    if origin is list:
+        return list_codec(*codec_for(arguments[0]))
+
+    if origin is tuple:
+        if len(arguments) == 2 and arguments[1] is Ellipsis:
+            writer, reader = list_codec(*codec_for(arguments[0]))
+            return (writer,
+                    lambda data, offset: as_tuple(*reader(data, offset)))
+        return tuple_codec([codec_for(argument) for argument in arguments])
+
+    if origin is dict:
+        return dict_codec(codec_for(arguments[0]), codec_for(arguments[1]))
+
+    if isinstance(annotation, type) and annotation in CLASS_CODES:
+        return (write_object, read_object)
+
+    raise Exception("No binary encoding for annotation " + str(annotation))
+
+codecs = dict()
+
+def writer_for(annotation):
+    if annotation not in codecs:
+        codecs[annotation] = codec_for(annotation)
+    return codecs[annotation][0]
+
+def reader_for(annotation):
+    if annotation not in codecs:
+        codecs[annotation] = codec_for(annotation)
+    return codecs[annotation][1]
+
+def enum_from_int(enum_class, data, offset):
+    value, offset = read_int(data, offset)
+    return (enum_class(value), offset)
+
+def as_tuple(value, offset):
+    return (tuple(value), offset)
+
+def optional_codec(writer, reader):
+    def write_optional(value, out):
+        if value == None:
+            out.append(0)
+        else:
+            out.append(1)
+            writer(value, out)
+
+    def read_optional(data, offset):
+        offset += 1
+        if data[offset-1] == 0:
+            return (None, offset)
+        return reader(data, offset)
+
+    return (write_optional, read_optional)
+
+def list_codec(writer, reader):
+    def write_list(value, out):
+        write_int(len(value), out)
+        for item in value:
+            writer(item, out)
+
+    def read_list(data, offset):
+        count, offset = read_int(data, offset)
+        result = []
+        for i in range(count):
+            item, offset = reader(data, offset)
+            result.append(item)
+        return (result, offset)
+
+    return (write_list, read_list)
+
+def tuple_codec(item_codecs):
+    def write_tuple(value, out):
+        if len(value) != len(item_codecs):
+            raise Exception("Expected a tuple of length " +
+                            str(len(item_codecs)) + ", got " + repr(value))
+        for (writer, reader), item in zip(item_codecs, value):
+            writer(item, out)
+
+    def read_tuple(data, offset):
+        items = []
+        for writer, reader in item_codecs:
+            item, offset = reader(data, offset)
+            items.append(item)
+        return (tuple(items), offset)
+
+    return (write_tuple, read_tuple)
+
+def dict_codec(key_codec, value_codec):
+    write_key, read_key = key_codec
+    write_value, read_value = value_codec
+
+    def write_dict(value, out):
+        write_int(len(value), out)
+        for key, item in value.items():
+            write_key(key, out)
+            write_value(item, out)
+
+    def read_dict(data, offset):
+        count, offset = read_int(data, offset)
+        result = dict()
+        for i in range(count):
+            key, offset = read_key(data, offset)
+            item, offset = read_value(data, offset)
+            result[key] = item
+        return (result, offset)
+
+    return (write_dict, read_dict)
+
+
+def encode(value, out=None):
+    out = bytearray() if out == None else out
+    write_object(value, out)
+    return out
+
+'''
+return (value, offset after it) for the object encoded at offset
+'''
+def decode(data, offset=0):
+    return read_object(memoryview(data), offset)
@@ -1,4 +1,5 @@
 from enum import Enum
+from collections import OrderedDict
 
 import pygame
 import crochet
@@ -24,7 +25,11 @@ BOTTOM_LEFT_WINDOW_SHAPE = (310, 300)
 RIGHT_WINDOW_SHAPE = (1290, 900)
 GRID_WIDTH = 30
 GRID_HEIGHT = 30
+BOARD_COLUMNS = RIGHT_WINDOW_SHAPE[0] // GRID_WIDTH
+BOARD_ROWS = RIGHT_WINDOW_SHAPE[1] // GRID_HEIGHT
 IMAGE_DIRECTORY = "images/"
+TILE_CACHE_SIZE = 2048 # composited board squares kept by DisplayBoard
+TEXT_CACHE_SIZE = 1024 # rendered strings kept by render_text
 
 load_whole_image_results = {}
 def load_whole_image(name):
@@ -38,26 +43,76 @@ def load_whole_image(name):
     return full_image
 
 
+load_image_square_results = {}
 def load_image_square(name, offset=(0, 0)):
+    if (name, offset) in load_image_square_results:
+        return load_image_square_results[(name, offset)]
     full_image = load_whole_image(name)
     square_rect = pygame.Rect(offset[0]*GRID_WIDTH,
                               offset[1]*GRID_HEIGHT,
                               GRID_WIDTH,
                               GRID_HEIGHT)
     image_square = full_image.subsurface(square_rect)
+    load_image_square_results[(name, offset)] = image_square
     return image_square
 
 
+class LRUCache:
+    '''
+    At most max_size values by key, forgetting the least recently used
+    value first.
+    '''
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.values = OrderedDict()
+
+    def __len__(self):
+        return len(self.values)
+
+    '''
+    return the value for key, calling make_value() for it if not cached
+    '''
+    def get(self, key, make_value):
+        if key in self.values:
+            self.values.move_to_end(key)
+            return self.values[key]
+        value = make_value()
+        self.values[key] = value
+        if len(self.values) > self.max_size:
+            self.values.popitem(last=False)
+        return value
+
+
+# (text, color, antialias) to the text rendered in DEFAULT_FONT
+text_surfaces = LRUCache(TEXT_CACHE_SIZE)
+def render_text(text, color, antialias=False):
+    return text_surfaces.get((text, color, antialias),
+                             lambda: DEFAULT_FONT.render(text,
+                                                         antialias,
+                                                         color))
+
+
 class Display:
     def __init__(self):
         self.screen = pygame.display.set_mode()
         self.play_screen = pygame.Surface(GAME_SHAPE)
         
-    def draw(self):
+    '''
+    show play_screen, centered on the screen; only the dirty_rects of
+    play_screen are updated if given, otherwise all of it
+    '''
+    def draw(self, dirty_rects=None):
         self.playtop_x = (self.screen.get_width() - self.play_screen.get_width()) // 2
         self.playtop_y = (self.screen.get_height() - self.play_screen.get_height()) // 2
-        self.screen.blit(self.play_screen, (self.playtop_x, self.playtop_y))
-        pygame.display.flip()
+        if dirty_rects == None:
+            self.screen.blit(self.play_screen, (self.playtop_x, self.playtop_y))
+            pygame.display.flip()
+            return
+        screen_rects = [rect.move(self.playtop_x, self.playtop_y)
+                        for rect in dirty_rects]
+        for rect, screen_rect in zip(dirty_rects, screen_rects):
+            self.screen.blit(self.play_screen, screen_rect, area=rect)
+        pygame.display.update(screen_rects)
 
     def playzone_mouse(self, screenzone_mouse):
         return (screenzone_mouse[0] - self.playtop_x,
@@ -74,10 +129,24 @@ class HighlightColor(Enum):
     LIGHT_BLUE = 7
 
 
+def square_occupants(coords, placeables):
+    return tuple((placeable.image_name, (coords[0] - placeable.coords[0],
+                                         coords[1] - placeable.coords[1]))
+                 for placeable in placeables)
+
+
 class DisplayBoard:
+    '''
+    The board as drawn in the right window.  Squares are only redrawn when
+    they are dirty: when what occupies them, as loaded by load_gameboard and
+    kept current by the placement events of a watched gameboard, or their
+    highlight for this frame, as set by highlight_square, differs from what
+    was drawn last.  resurface draws the dirty squares and returns their
+    rects.
+    '''
     def __init__(self):
         self.surface = pygame.Surface(RIGHT_WINDOW_SHAPE)
-        self.squares = dict() # coords to list of images
+        self.squares = dict() # coords to tuple of (image name, offset)
         self.light_square = load_image_square("light_square")
         self.dark_square = load_image_square("dark_square")
         self.highlight_squares = {
@@ -89,55 +158,112 @@ class DisplayBoard:
             HighlightColor.LIGHT_BLUE: load_image_square("light_blue"),
             HighlightColor.LIGHT_GREEN: load_image_square("light_green"),}
         self.highlighted_square = None
+        self.watched_gameboard = None
+        self.highlights = dict() # coords to HighlightColor for this frame
+        self.drawn_highlights = dict() # highlights drawn last frame
+        self.dirty = set((x, y) for x in range(BOARD_COLUMNS)
+                         for y in range(BOARD_ROWS))
+        # (parity, occupants, highlight) to composited square
+        self.tiles = LRUCache(TILE_CACHE_SIZE)
 
+    '''
+    the composited square, shared by every square with the same background,
+    occupants and highlight, so do not draw on it
+    '''
     def surface_for_square(self, x, y, highlight=None):
+        key = ((x+y)%2, self.squares.get((x, y), ()), highlight)
+        return self.tiles.get(key, lambda: self.build_tile(*key))
+
+    def build_tile(self, parity, occupants, highlight):
         surface = pygame.Surface((GRID_WIDTH, GRID_HEIGHT))
-        background_square = self.light_square if (x+y)%2==0 else self.dark_square
+        background_square = self.light_square if parity==0 else self.dark_square
         surface.blit(background_square, (0, 0))
-        if (x, y) in self.squares:
-            images = self.squares[(x, y)]
-            for image in images:
-                surface.blit(image, (0, 0))
+        for image_name, offset in occupants:
+            surface.blit(load_image_square(image_name, offset), (0, 0))
         if (highlight):
             surface.blit(self.highlight_squares[highlight], (0, 0))
-        return surface
+        return surface.convert()
 
+    '''
+    draw the dirty squares with this frame's highlights, start the next
+    frame without highlights, and return the rects drawn over
+    '''
     def resurface(self):
-        for x in range(43):
-            for y in range(30):
-                self.draw_square(x, y)
+        dirty = self.dirty
+        for coords in set(self.highlights) | set(self.drawn_highlights):
+            if (self.highlights.get(coords, None) !=
+                self.drawn_highlights.get(coords, None)):
+                dirty.add(coords)
+        dirty_rects = []
+        for x, y in dirty:
+            if 0 <= x < BOARD_COLUMNS and 0 <= y < BOARD_ROWS:
+                dirty_rects.append(self.draw_square(
+                    x,
+                    y,
+                    highlight=self.highlights.get((x, y), None)))
+        self.dirty = set()
+        self.drawn_highlights = self.highlights
+        self.highlights = dict()
+        return dirty_rects
 
     def draw_square(self, x, y, highlight=None):
-        self.surface.blit(self.surface_for_square(x, y, highlight=highlight),
-                          (x*GRID_WIDTH, y*GRID_HEIGHT))
+        return self.surface.blit(self.surface_for_square(x, y,
+                                                         highlight=highlight),
+                                 (x*GRID_WIDTH, y*GRID_HEIGHT))
 
     '''
-    draws mouseover highlight and returns highlighted game grid coords
+    highlight a square this frame, over any highlight set for it before
+    '''
+    def highlight_square(self, x, y, highlight):
+        self.highlights[(x, y)] = highlight
+
+    '''
+    highlights the moused over square and returns highlighted game grid coords
     '''
     def highlight(self, mouse_position) -> tuple:
         mouse_board_position = (mouse_position[0] - TOP_LEFT_WINDOW_SHAPE[0],
                                 mouse_position[1])
-        if self.highlighted_square != None:
-            self.draw_square(self.highlighted_square[0],
-                              self.highlighted_square[1])
         if self.surface.get_rect().collidepoint(mouse_board_position):
             self.highlighted_square = (mouse_board_position[0]//GRID_WIDTH,
                                        mouse_board_position[1]//GRID_HEIGHT)
-            self.draw_square(self.highlighted_square[0],
-                             self.highlighted_square[1],
-                             highlight=HighlightColor.WHITE)
+            self.highlight_square(self.highlighted_square[0],
+                                  self.highlighted_square[1],
+                                  HighlightColor.WHITE)
         else:
             self.highlighted_square = None
         return self.highlighted_square
 
     def load_gameboard(self, gameboard):
-        self.squares = {}
+        squares = dict()
         for coords, placeables in gameboard.squares.items():
-            for placeable in placeables:
-                offset = (coords[0] - placeable.coords[0],
-                          coords[1] - placeable.coords[1])
-                image = load_image_square(placeable.image_name, offset)
-                self.squares[coords] = self.squares.get(coords, []) + [image]
+            squares[coords] = square_occupants(coords, placeables)
+        for coords in set(squares) | set(self.squares):
+            if squares.get(coords, ()) != self.squares.get(coords, ()):
+                self.dirty.add(coords)
+        self.squares = squares
+
+    '''
+    load gameboard and keep up with its placement events from now on, so
+    it does not need to be loaded again
+    '''
+    def watch_gameboard(self, gameboard):
+        self.load_gameboard(gameboard)
+        self.watched_gameboard = gameboard
+        gameboard.add_placement_listener(self.placement_changed)
+
+    def placement_changed(self, event, placeable, previous_coords):
+        changed = gameplay.covered_squares(placeable)
+        if previous_coords != None:
+            changed += [(previous_coords[0]+i, previous_coords[1]+j)
+                        for i in range(placeable.size)
+                        for j in range(placeable.size)]
+        for coords in changed:
+            occupants = square_occupants(
+                coords,
+                self.watched_gameboard.squares.get(coords, []))
+            if occupants != self.squares.get(coords, ()):
+                self.squares[coords] = occupants
+                self.dirty.add(coords)
 
     '''
     Based on the submitted actions in gameturn, draw highlights of
@@ -154,9 +280,9 @@ class DisplayBoard:
                                                          unit.size)
                     chosen_blast = blast_paths[action.blast_index]
                     for square in chosen_blast:
-                        self.draw_square(square[0],
-                                         square[1],
-                                         HighlightColor.LIGHT_RED)
+                        self.highlight_square(square[0],
+                                              square[1],
+                                              HighlightColor.LIGHT_RED)
                 if action.is_locomotor():
                     shape_type = gameplay.shape_enum_to_object(part.shape_type)
                     move_paths = shape_type.move_paths(unit.coords,
@@ -168,16 +294,16 @@ class DisplayBoard:
                         if target_coords not in path:
                             continue
                         for square in path:
-                            self.draw_square(square[0],
-                                             square[1],
-                                             HighlightColor.LIGHT_GREEN)
+                            self.highlight_square(square[0],
+                                                  square[1],
+                                                  HighlightColor.LIGHT_GREEN)
                             if square == target_coords:
                                 break
                 if action.is_producer():
                     if action.out_coords != None:
-                        self.draw_square(action.out_coords[0],
-                                         action.out_coords[1],
-                                         HighlightColor.LIGHT_BLUE)
+                        self.highlight_square(action.out_coords[0],
+                                              action.out_coords[1],
+                                              HighlightColor.LIGHT_BLUE)
                                 
                         
 
@@ -193,7 +319,7 @@ class DisplayBoard:
                               (HighlightColor.GREEN, move),
                               (HighlightColor.BLUE, produce)]:
             for square in squares:
-                self.draw_square(square[0], square[1], highlight=color)
+                self.highlight_square(square[0], square[1], color)
                 
 
 class HighlightInfo:
@@ -221,6 +347,10 @@ class MouseoverWindow:
         self.locked = None
         self.ui_active_part = None
         self.intermediary_production_unit = None
+        self.dirty = True # drawn on since last shown
+        self.stale = True # must be drawn again, its inputs having changed
+        self.drawn_inputs = None
+        self.drawn_turn = None
 
     def mouse_to_part_index(self, mouse_pos):
         part_zone_y = (mouse_pos[1] - self.part_zone_offset)
@@ -241,6 +371,7 @@ class MouseoverWindow:
               research_mouseover,
               turn_submitted):
 
+        self.stale = True
         click_handled = False
         if (not turn_submitted):
             click_handled = self.gameturn_input_for_click(gameboard,
@@ -379,6 +510,7 @@ class MouseoverWindow:
     def set_locked_unit(self, locked):
         self.deselect_part()
         self.locked = locked
+        self.stale = True
 
     '''
     Based on selected units and parts, build a HighlightInfo to
@@ -415,6 +547,46 @@ class MouseoverWindow:
                 highlightInfo.produce_highlights.add(coord)
         return highlightInfo
 
+    '''
+    Draw the window for this frame, showing the moused over research
+    prototype if any, unless nothing it shows has changed since it was last
+    drawn.  Clicks and locking make it stale, and so does a new gameturn,
+    which comes with every turn resolved.
+    '''
+    def update(self,
+               gameboard,
+               mouseover_coords,
+               local_player,
+               gameturn,
+               mouse_pos,
+               research_mouseover):
+        part_index = self.mouse_to_part_index(mouse_pos)
+        if not self.legitimate_part_index(part_index, mouse_pos):
+            part_index = None
+        inputs = (mouseover_coords,
+                  self.locked,
+                  self.ui_active_part,
+                  self.intermediary_production_unit,
+                  part_index,
+                  research_mouseover)
+        if (not self.stale and
+            inputs == self.drawn_inputs and
+            gameturn is self.drawn_turn):
+            return
+        self.stale = False
+        self.drawn_inputs = inputs
+        self.drawn_turn = gameturn
+        self.draw_mouseover_info(gameboard,
+                                 mouseover_coords,
+                                 local_player,
+                                 gameturn,
+                                 mouse_pos)
+        if (research_mouseover != None):
+            self.draw_unit_info(research_mouseover,
+                                local_player,
+                                gameturn,
+                                clear_first=True)
+
     '''
     Based on moused over coords, draw everything in the window and
     return the unit that is moused over
@@ -425,6 +597,7 @@ class MouseoverWindow:
                             local_player,
                             gameturn,
                             mouse_pos):
+        self.dirty = True
         self.surface.fill((60, 30, 30))
         placeables = gameboard.squares.get(mouseover_coords, [])
         resources = 0
@@ -440,9 +613,8 @@ class MouseoverWindow:
             self.draw_unit_info(unit, local_player, gameturn)
         if (resources != 0):
             self.surface.blit(self.resource_image, (210, 160))
-            resource_text = DEFAULT_FONT.render("x " + str(resources),
-                                                False,
-                                                (255, 255, 255))
+            resource_text = render_text("x " + str(resources),
+                                        (255, 255, 255))
             self.surface.blit(resource_text, (250, 170))
 
         if (self.locked != None):
@@ -481,12 +653,12 @@ class MouseoverWindow:
                         "+" + str(this_turn_addition)+ '/' +
                         str(points_to_produce))
             under_production_string = "-> " + unit_name + " " + progress
-            producer_text = DEFAULT_FONT.render(under_production_string,
-                                                False,
-                                                (255, 255, 255))
+            producer_text = render_text(under_production_string,
+                                        (255, 255, 255))
             self.surface.blit(producer_text, (10, 550))
     
     def draw_unit_info(self, unit, local_player, gameturn, clear_first = False):
+        self.dirty = True
         if (clear_first == True):
             self.surface.fill((60, 30, 30))
         image = load_whole_image(unit.image_name)
@@ -502,30 +674,25 @@ class MouseoverWindow:
                 color = (255, 255, 0)
             elif part in activated_parts:
                 color = (0, 255, 0)
-            size_text = DEFAULT_FONT.render(str(part.size),
-                                            False,
-                                            color)
+            size_text = render_text(str(part.size),
+                                    color)
             quality_string = "%6.2f" % (part.quality)
-            quality_text = DEFAULT_FONT.render(quality_string,
-                                               False,
-                                               color)
-            type_text = DEFAULT_FONT.render(part.display_name(),
-                                            False,
-                                            color)
+            quality_text = render_text(quality_string,
+                                       color)
+            type_text = render_text(part.display_name(),
+                                    color)
             current_hp_string = str(part.max_hp()-part.damage)
             hp_string = current_hp_string + "/" + str(part.max_hp())
-            hp_text = DEFAULT_FONT.render(hp_string,
-                                          False,
-                                          color)
+            hp_text = render_text(hp_string,
+                                  color)
             self.surface.blit(size_text, (10, y))
             self.surface.blit(quality_text, (35, y))
             self.surface.blit(type_text, (110, y))
             self.surface.blit(hp_text, (240, y))
             y+=self.part_zone_increment
 
-        energy_text = DEFAULT_FONT.render("Energy: ",
-                                          False,
-                                          (255, 255, 255))
+        energy_text = render_text("Energy: ",
+                                  (255, 255, 255))
         self.surface.blit(energy_text, (210, 20))
         amount_info = gameturn.unit_pending_true_max_gain_energy(local_player,
                                                                   unit)
@@ -535,19 +702,16 @@ class MouseoverWindow:
         maximum = str(maximum)
         gain = str(gain)
         amount_string = "("+true+")"
-        energy_text = DEFAULT_FONT.render(amount_string,
-                                          False,
-                                          (255, 255, 255))
+        energy_text = render_text(amount_string,
+                                  (255, 255, 255))
         self.surface.blit(energy_text, (210, 44))
         amount_string = pending+"+"+gain
-        energy_text = DEFAULT_FONT.render(amount_string,
-                                          False,
-                                          (255, 255, 255))
+        energy_text = render_text(amount_string,
+                                  (255, 255, 255))
         self.surface.blit(energy_text, (210, 64))
         amount_string = "/"+maximum
-        energy_text = DEFAULT_FONT.render(amount_string,
-                                          False,
-                                          (255, 255, 255))
+        energy_text = render_text(amount_string,
+                                  (255, 255, 255))
         self.surface.blit(energy_text, (210, 84))
 
         
@@ -557,12 +721,10 @@ class ResearchWindow:
         self.surface = pygame.Surface(BOTTOM_LEFT_WINDOW_SHAPE)
         self.surface.fill((30, 60, 30))
         self.resource_image = load_whole_image("medium_resource")
-        progress_image = DEFAULT_FONT.render("Research Progress:",
-                                             False,
-                                             (255, 255, 255))
-        resources_text = DEFAULT_FONT.render("Store:",
-                                             False,
-                                             (255, 255, 255))
+        progress_image = render_text("Research Progress:",
+                                     (255, 255, 255))
+        resources_text = render_text("Store:",
+                                     (255, 255, 255))
         self.surface.blit(resources_text, (30, 255))
         self.surface.blit(progress_image, (10, 10))
         self.surface.blit(self.resource_image, (0, 250))
@@ -571,8 +733,11 @@ class ResearchWindow:
         self.research_box_width = self.research_box_surface.get_width()
         self.research_box_height = self.research_box_surface.get_height()
         self.prototype_zone_offset = 40
-        self.research_boxes = []
+        # box row, column to (what the box shows, its drawn surface)
+        self.research_boxes = dict()
         self.prototypes = dict() # box row, column to Unit prototype
+        self.drawn_strings = dict() # position to the string drawn there
+        self.dirty = True # drawn on since last shown
 
         self.draw_button_text("Submit turn 1", (50, 70, 50))
 
@@ -581,10 +746,10 @@ class ResearchWindow:
         next_turn_button.fill(button_color)
         self.surface.blit(next_turn_button, (155, 232))
         
-        submit_text = DEFAULT_FONT.render(text,
-                                          False,
-                                          (255, 255, 255))
+        submit_text = render_text(text,
+                                  (255, 255, 255))
         self.surface.blit(submit_text, (165, 255))
+        self.dirty = True
         
     '''
     Return true if submit turn button clicked else false
@@ -606,40 +771,49 @@ class ResearchWindow:
         research_box = pygame.Surface((self.research_box_width,
                                        self.research_box_height))
         research_box.fill((30, 60, 30))
-        research_box.blit(load_whole_image("research_box"), (0, 0))
+        research_box.blit(self.research_box_surface, (0, 0))
 
         prototype = self.prototypes.get((row, column), None)
         if (prototype != None):
             name = prototype.unit_name
             locked = player.research_fraction() < prototype.research_threshhold
             color = (125, 125, 125) if locked else (255, 255, 255)
-            name_text = DEFAULT_FONT.render(name[:5],
-                                            False,
-                                            color)
+            name_text = render_text(name[:5],
+                                    color)
             research_string = "{0:.1%}".format(prototype.research_threshhold)
-            research_text = DEFAULT_FONT.render(research_string,
-                                                False,
-                                                (255, 255, 255))
+            research_text = render_text(research_string,
+                                        (255, 255, 255))
             cost_string = str(prototype.production_cost)
-            cost_text = DEFAULT_FONT.render(cost_string,
-                                            False,
-                                            (255, 255, 255))
+            cost_text = render_text(cost_string,
+                                    (255, 255, 255))
 
             research_box.blit(name_text, (2, 4))
             research_box.blit(research_text, (62, 4))
             research_box.blit(cost_text, (125, 4))
         return research_box
 
+    '''
+    redraw the research boxes whose prototype or its research lock changed
+    '''
     def draw_boxes(self, player):
         for i in range(6):
-            row = []
             for j in range(2):
+                prototype = self.prototypes.get((i, j), None)
+                shown = None
+                if (prototype != None):
+                    shown = (prototype.unit_name,
+                             prototype.research_threshhold,
+                             prototype.production_cost,
+                             player.research_fraction() <
+                             prototype.research_threshhold)
+                if ((i, j) in self.research_boxes and
+                    self.research_boxes[(i, j)][0] == shown):
+                    continue
                 research_box = self.build_box(i, j, player)
                 position = self.research_box_position(i, j)
                 self.surface.blit(research_box, position)
-                row.append(research_box)
-                
-            self.research_boxes.append(row)
+                self.research_boxes[(i, j)] = (shown, research_box)
+                self.dirty = True
 
     def local_mouse_pos(self, mouse_pos):
         research_pos = (mouse_pos[0],
@@ -661,25 +835,29 @@ class ResearchWindow:
         else:
             return None
 
+    '''
+    draw string over a background of size at position, unless it is
+    already drawn there
+    '''
+    def draw_string(self, string, position, size):
+        if self.drawn_strings.get(position, None) == string:
+            return
+        background = pygame.Surface(size)
+        background.fill((30, 60, 30))
+        self.surface.blit(background, position)
+        self.surface.blit(render_text(string, (255, 255, 255)), position)
+        self.drawn_strings[position] = string
+        self.dirty = True
+
     def draw_player_info(self, player):
         self.displayed_player = player
 
-        percentage_background = pygame.Surface((80, 30))
-        percentage_background.fill((30, 60, 30))
-        self.surface.blit(percentage_background, (230, 10))
-        percentage_string = "{0:.1%}".format(player.research_fraction())
-        percentage_text = DEFAULT_FONT.render(percentage_string,
-                                              False,
-                                              (255, 255, 255))
-        self.surface.blit(percentage_text, (230, 10))
-
-        resource_background = pygame.Surface((50, 30))
-        resource_background.fill((30, 60, 30))
-        self.surface.blit(resource_background, (105, 255))
-        resource_text = DEFAULT_FONT.render(str(player.resource_amount),
-                                            False,
-                                            (255, 255, 255))
-        self.surface.blit(resource_text, (105, 255))
+        self.draw_string("{0:.1%}".format(player.research_fraction()),
+                         (230, 10),
+                         (80, 30))
+        self.draw_string(str(player.resource_amount),
+                         (105, 255),
+                         (50, 30))
 
         for i in range(len(player.unit_prototypes)):
             prototype = player.unit_prototypes[i]
@@ -698,8 +876,10 @@ def run_game(gameflow, gamestate):
     research_window = ResearchWindow()
     display_board = DisplayBoard()
 
-    display_board.load_gameboard(gamestate.gameboard)
+    display_board.watch_gameboard(gamestate.gameboard)
     display_board.resurface()
+    display.play_screen.blit(display_board.surface,
+                             (TOP_LEFT_WINDOW_SHAPE[0], 0))
 
     display.draw()
 
@@ -716,33 +896,36 @@ def run_game(gameflow, gamestate):
         frame += 1
         clock.tick(30)
 
-        display_board.load_gameboard(gamestate.gameboard)
-        display_board.resurface()
-        
         playzone_mouse = display.playzone_mouse(pygame.mouse.get_pos())
         highlighted_coords = display_board.highlight(playzone_mouse)
-        mouseover_window.draw_mouseover_info(gamestate.gameboard,
-                                             highlighted_coords,
-                                             local_player,
-                                             working_turn,
-                                             playzone_mouse)
         research_mouseover = research_window.mouseover_check(playzone_mouse)
-        if (research_mouseover != None):
-            mouseover_window.draw_unit_info(research_mouseover,
-                                            local_player,
-                                            working_turn,
-                                            clear_first=True)
+        mouseover_window.update(gamestate.gameboard,
+                                highlighted_coords,
+                                local_player,
+                                working_turn,
+                                playzone_mouse,
+                                research_mouseover)
 
         additional_highlights: HighlightInfo = mouseover_window.get_highlights()
         display_board.draw_working_turn(working_turn, local_player)
         display_board.draw_highlights(additional_highlights)
+        board_rects = display_board.resurface()
         
-        display.play_screen.blit(mouseover_window.surface, (0, 0))
-        display.play_screen.blit(research_window.surface,
-                                 (0, TOP_LEFT_WINDOW_SHAPE[1]))
-        display.play_screen.blit(display_board.surface,
-                                 (TOP_LEFT_WINDOW_SHAPE[0], 0))
-        display.draw()
+        dirty_rects = []
+        for window, position in [(mouseover_window, (0, 0)),
+                                 (research_window,
+                                  (0, TOP_LEFT_WINDOW_SHAPE[1]))]:
+            if window.dirty:
+                display.play_screen.blit(window.surface, position)
+                dirty_rects.append(window.surface.get_rect(topleft=position))
+                window.dirty = False
+        for rect in board_rects:
+            play_rect = rect.move(TOP_LEFT_WINDOW_SHAPE[0], 0)
+            display.play_screen.blit(display_board.surface,
+                                     play_rect,
+                                     area=rect)
+            dirty_rects.append(play_rect)
+        display.draw(dirty_rects)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
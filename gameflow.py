@@ -1,17 +1,20 @@
-import copy
-import time
-
 from uuid import uuid4
 
 import gameplay
 import game_io
+import history
 import networking
 import messages
 
 
 class Turnsource:
-    def __init__(self):
+    '''
+    send_message(message) returns a request whose response attribute is set
+    once the host answers, like networking.send_message
+    '''
+    def __init__(self, send_message=networking.send_message):
         self.player_number = None # gets set when added to a gameflow
+        self.send_message = send_message
 
     def turn_ready(self, turn_index):
         raise Exception("turn_ready called on Turnsource superclass.")
@@ -22,7 +25,7 @@ class Turnsource:
 class LocalTurnsource(Turnsource):
     def submit_turn(self, turn, turn_index):
         self.turn = turn
-        networking.send_message(
+        self.send_message(
             messages.ReportTurnRequest(gameturn=turn,
                                        turn_index=turn_index))
 
@@ -33,47 +36,54 @@ class LocalTurnsource(Turnsource):
         return self.turn
 
 class InternetTurnsource(Turnsource):    
-    def __init__(self):
-        self.response_protocol = None
-        self.last_request_time = 0
+    def __init__(self, send_message=networking.send_message):
+        super().__init__(send_message)
+        self.pending_request = None
+        self.turn_index = None
 
+    '''
+    subscribe to the turn once; the host answers as soon as it is complete
+    '''
     def turn_ready(self, turn_index):
-        if (self.response_protocol != None
-            and self.response_protocol.response != None
-            and self.response_protocol.response.gameturn != None):
-            return True
-        
-        if (self.response_protocol != None
-            and self.response_protocol.response != None
-            and self.response_protocol.response.gameturn == None):
-            self.response_protocol = None
-        
-        if ((time.time() - self.last_request_time) > 5
-             and self.response_protocol == None):
-            self.response_protocol = networking.send_message(
-                messages.TurnPollRequest(turn_index=turn_index))
-            self.last_request_time = time.time()
+        if self.pending_request == None or self.turn_index != turn_index:
+            self.pending_request = self.send_message(
+                messages.TurnSubscribeRequest(turn_index=turn_index))
+            self.turn_index = turn_index
 
-        return False
+        response = self.pending_request.response
+        if isinstance(response, messages.ErrorResponse):
+            raise Exception("The host could not handle the request: " +
+                            response.error)
+        return response != None
 
     def get_turn(self):
-        turn = self.response_protocol.response.gameturn
-        self.response_protocol = None
+        turn = self.pending_request.response.gameturn
+        self.pending_request = None
         return turn
 
 class Gameflow:
-    def __init__(self, local_player_number, starting_gamestate):
-        self.local_turnsource = LocalTurnsource()
+    def __init__(self,
+                 local_player_number,
+                 starting_gamestate,
+                 history_path=None,
+                 keyframe_interval=50,
+                 send_message=networking.send_message):
+        self.local_turnsource = LocalTurnsource(send_message)
         self.local_turnsource.player_number = local_player_number
         self.turnsources = set([self.local_turnsource])
 
         for player in starting_gamestate.players:
             if (player.player_number != local_player_number):
-                new_turnsource = InternetTurnsource()
+                new_turnsource = InternetTurnsource(send_message)
                 new_turnsource.player_number = player.player_number
                 self.turnsources.add(new_turnsource)                
 
-        self.gamestate_record = [copy.deepcopy(starting_gamestate)]
+        if history_path == None:
+            self.gamestate_record = history.GamestateRecord(starting_gamestate)
+        else:
+            self.gamestate_record = history.TurnLog(history_path,
+                                                    starting_gamestate,
+                                                    keyframe_interval)
         self.tick = 0
 
     def get_local_player(self, gamestate):
@@ -94,7 +104,7 @@ class Gameflow:
             turns = [turnsource.get_turn() for turnsource in self.turnsources]
             merged_turn = gameplay.merge_turns(turns)
             gameplay.advance_gamestate_via_mutation(gamestate, merged_turn)
-            self.gamestate_record.append(copy.deepcopy(gamestate))
+            self.gamestate_record.append(gamestate, merged_turn)
             return True
         return False
 
@@ -104,62 +114,6 @@ class Gameflow:
 
 
 
-def first_arena(players):
-    if len(players) != 2:
-        raise Exception("Exactly two players required.  Found " +
-                        str(len(players)) + ".")
-    
-    gameboard = gameplay.Gameboard(squares=dict())
-    mothership_one = None
-    mothership_two = None
-    player_one = None
-    player_two = None
-    for player in players:
-        if player.player_number == 1:
-            player_one = player
-            mothership_one = gameplay.get_mothership(player)
-        if player.player_number == 2:
-            player_two = player
-            mothership_two = gameplay.get_mothership(player)
-
-    if not all([variable != None for variable in [mothership_one,
-                                                  mothership_two,
-                                                  player_one,
-                                                  player_two]]):
-        raise Exception("Player or mothership not found.")
-
-    mothership_one.coords = (4, 15)
-    mothership_two.coords = (35, 15)
-    gameboard.add_to_board(mothership_one)
-    gameboard.add_to_board(mothership_two)
-
-    for x in range(4, 6):
-        for y in range(4, 6):            
-            resource = game_io.resource_pile_factory((x, y), 25)
-            gameboard.add_to_board(resource)
-    for x in range(35, 37):
-        for y in range(24, 26):            
-            resource = game_io.resource_pile_factory((x, y), 50)
-            gameboard.add_to_board(resource)
-    for x in range(4, 6):
-        for y in range(24, 26):            
-            resource = game_io.resource_pile_factory((x, y), 25)
-            gameboard.add_to_board(resource)
-    for x in range(35, 37):
-        for y in range(24, 26):            
-            resource = game_io.resource_pile_factory((x, y), 50)
-            gameboard.add_to_board(resource)
-    for x in range(20, 26):
-        for y in range(13,17):            
-            resource = game_io.resource_pile_factory((x, y), 90)
-            gameboard.add_to_board(resource)
-    
-
-    return gameplay.Gamestate(gameboard=gameboard, players=players)
-            
-
-
-
 def test_gamestate():
     gameboard = gameplay.Gameboard(squares=dict())
     test_resource = game_io.resource_pile_factory((6,6), 50)
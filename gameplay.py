@@ -1,10 +1,12 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 from typing import Dict, List, Tuple, Optional, Union
 from enum import Enum
 from copy import deepcopy
 from uuid import UUID, uuid4
 from random import Random
+from array import array
+from collections.abc import Mapping
 
 class ShapeTypeEnum(Enum):
     BISHOP = 1
@@ -14,17 +16,9 @@ class ShapeTypeEnum(Enum):
     QUEEN = 5
 
 def shape_enum_to_object(enum: ShapeTypeEnum):
-    if enum == ShapeTypeEnum.BISHOP:
-        return Bishop()
-    elif enum == ShapeTypeEnum.ROOK:
-        return Rook()
-    elif enum == ShapeTypeEnum.KNIGHT:
-        return Knight()
-    elif enum == ShapeTypeEnum.KING:
-        return King()
-    elif enum == ShapeTypeEnum.QUEEN:
-        return Queen()
-    raise "Unrecognized enum"
+    if enum in SHAPE_OBJECTS:
+        return SHAPE_OBJECTS[enum]
+    raise Exception("Unrecognized enum")
 
 @dataclass(eq=False)
 class NetHashable:
@@ -208,7 +202,7 @@ def get_mothership(player):
     mothership_prototype = get_mothership_prototype(player)
     mothership = deepcopy(mothership_prototype)
     mothership.set_owner(player)
-    mothership.uuid = uuid4()
+    mothership.evolve_uuid(int(player.uuid))
     return mothership
 
 @dataclass(eq=False)
@@ -234,20 +228,135 @@ class Player(NetHashable):
     def unit_unlocked(self, unit):
         return self.research_fraction() >= unit.research_threshhold
 
+    def prototype_named(self, unit_name):
+        for prototype in self.unit_prototypes:
+            if prototype.unit_name == unit_name:
+                return prototype
+        raise Exception("Player has no unit prototype named " + unit_name)
+
+def covered_squares(placeable):
+    return [(placeable.coords[0]+i, placeable.coords[1]+j)
+            for i in range(placeable.size) for j in range(placeable.size)]
+
+def unit_count(placeables):
+    return sum(1 for p in placeables if p.is_unit())
+
+class UuidRegistry:
+    '''
+    uuid -> object index over the placeables on a board and their parts,
+    kept current by add_to_board and remove_from_board and ordered by when
+    each placeable was last added
+    '''
+    def clear_registry(self):
+        self._registry = dict()
+
+    def register(self, placeable):
+        self._registry.pop(placeable.uuid, None)
+        self._registry[placeable.uuid] = placeable
+        if placeable.is_unit():
+            for part in placeable.parts:
+                self._registry[part.uuid] = part
+
+    def unregister(self, placeable):
+        self._registry.pop(placeable.uuid, None)
+        if placeable.is_unit():
+            for part in placeable.parts:
+                self._registry.pop(part.uuid, None)
+
+    def get_by_uuid(self, uuid):
+        return self._registry.get(uuid, None)
+
+    '''
+    placeables on the board, least recently added first, so adding them to
+    an empty board in this order reproduces every square's occupant order
+    '''
+    def placeables(self):
+        return [entry for entry in self._registry.values()
+                if isinstance(entry, Placeable)]
+
+class PlacementEvent(Enum):
+    ADDED = 1
+    REMOVED = 2
+    MOVED = 3
+    RESOURCE_AMOUNT_CHANGED = 4
+
+class PlacementEvents:
+    '''
+    Placement listeners of a board, called as
+    listener(event, placeable, previous_coords) after every change to the
+    board, previous_coords being the coords a MOVED placeable moved from and
+    None for other events.  Listeners belong to the board object, not to the
+    game, so copies and pickles of the board have none.
+    '''
+    def clear_placement_listeners(self):
+        self._placement_listeners = []
+
+    def add_placement_listener(self, listener):
+        self._placement_listeners.append(listener)
+
+    def remove_placement_listener(self, listener):
+        self._placement_listeners.remove(listener)
+
+    def placement_changed(self, event, placeable, previous_coords=None):
+        for listener in self._placement_listeners:
+            listener(event, placeable, previous_coords)
+
+    def add_to_board(self, placeable):
+        self.place(placeable)
+        self.placement_changed(PlacementEvent.ADDED, placeable)
+
+    def remove_from_board(self, placeable):
+        self.unplace(placeable)
+        self.placement_changed(PlacementEvent.REMOVED, placeable)
+
+    def move_on_board(self, placeable, coords):
+        previous_coords = placeable.coords
+        self.unplace(placeable)
+        placeable.coords = coords
+        self.place(placeable)
+        self.placement_changed(PlacementEvent.MOVED,
+                               placeable,
+                               previous_coords)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_placement_listeners"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.clear_placement_listeners()
+
 @dataclass(eq=False)
-class Gameboard:
-    squares: Dict[Tuple[int, int], List[Union['Unit', 'ResourcePile', 'Wall']]]
+class Gameboard(UuidRegistry, PlacementEvents):
+    squares: Dict[Tuple[int, int],
+                  List[Union['Unit', 'ResourcePile', 'Wall']]] = field(
+                      default_factory=dict)
+
+    def __post_init__(self):
+        self.clear_placement_listeners()
+        self.prune_transporter_clones()
+
+    '''
+    rebuild the set of squares holding more than one unit, which
+    add_to_board and remove_from_board keep current afterwards
+    '''
+    def find_contested_squares(self):
+        self._contested = set(coords for coords, placeables
+                              in self.squares.items()
+                              if unit_count(placeables) > 1)
 
     def prune_transporter_clones(self):
-        originals = dict()
+        self.clear_registry()
         new_squares = dict()
         for coords, placeables in self.squares.items():
             new_squares[coords] = list()
             for placeable in placeables:
-                if placeable not in originals:
-                    originals[placeable] = placeable
-                new_squares[coords].append(originals[placeable])
+                if self.get_by_uuid(placeable.uuid) == None:
+                    self.register(placeable)
+                new_squares[coords].append(self.get_by_uuid(placeable.uuid))
         self.squares = new_squares
+        self.find_contested_squares()
 
     def get_single_occupant(self, square):
         occupants = self.squares.get(square, [])
@@ -258,60 +367,337 @@ class Gameboard:
             return occupants[0]
         raise Exception("Multiple occupants found")
 
-    def add_to_board(self, placeable):
-        size = placeable.size
-        for i in range(size):
-            for j in range(size):
-                coords = (placeable.coords[0]+i, placeable.coords[1]+j)
-                self.squares[coords] = self.squares.get(coords, []) + [placeable]
-
-    def remove_from_board(self, placeable):
-        size = placeable.size
-        for i in range(size):
-            for j in range(size):
-                coords = (placeable.coords[0]+i, placeable.coords[1]+j)
-                if not (placeable in self.squares[coords]):
-                    raise Exception("Expected placeable not found at " +
-                                    str(coords))
-                self.squares[coords].remove(placeable)
+    def place(self, placeable):
+        self.register(placeable)
+        for coords in covered_squares(placeable):
+            placeables = self.squares.setdefault(coords, [])
+            placeables.append(placeable)
+            if placeable.is_unit() and unit_count(placeables) > 1:
+                self._contested.add(coords)
+
+    def unplace(self, placeable):
+        for coords in covered_squares(placeable):
+            if not (placeable in self.squares[coords]):
+                raise Exception("Expected placeable not found at " +
+                                str(coords))
+            self.squares[coords].remove(placeable)
+            if (coords in self._contested and
+                unit_count(self.squares[coords]) <= 1):
+                self._contested.remove(coords)
+        self.unregister(placeable)
+
+    def units(self):
+        units = dict()
+        for placeables in self.squares.values():
+            for placeable in placeables:
+                if placeable.is_unit():
+                    units[placeable] = placeable
+        return list(units)
 
     def conflicts_exist(self):
-        for placeables in self.squares.values():
-            units = [p for p in placeables if p.is_unit()]
-            if len(units) > 1:
-                return True
-        return False
+        return len(self._contested) > 0
+
+    '''
+    yield contested coords in sorted order, including squares that become
+    contested further along the order while the caller resolves earlier ones
+    '''
+    def contested_squares(self):
+        previous = None
+        while True:
+            remaining = [coords for coords in self._contested
+                         if previous == None or coords > previous]
+            if len(remaining) == 0:
+                return
+            previous = min(remaining)
+            yield previous
 
     def adding_would_cause_conflict(self, placeable):
-        self.add_to_board(placeable)
-        result = self.conflicts_exist()
-        self.remove_from_board(placeable)
-        return result
-        
+        if self.conflicts_exist():
+            return True
+        if not placeable.is_unit():
+            return False
+        return any(unit_count(self.squares.get(coords, [])) > 0
+                   for coords in covered_squares(placeable))
+
+    '''
+    the occupant lists of the squares placeable covers that may hold
+    resource piles
+    '''
+    def resource_squares(self, placeable):
+        return [self.squares[coords] for coords in covered_squares(placeable)]
+
+    def resource_amount_changed(self, resource_pile):
+        self.placement_changed(PlacementEvent.RESOURCE_AMOUNT_CHANGED,
+                               resource_pile)
+
+
+BOARD_WIDTH = 43
+BOARD_HEIGHT = 30
+BOARD_AREA = BOARD_WIDTH * BOARD_HEIGHT
 
 def unit_placement_in_bounds(coord, unit_size):
     return (in_bounds(coord)
             and in_bounds((coord[0]+unit_size-1, coord[1]+unit_size-1)))
 
 def in_bounds(coord):
-    return coord[0] < 43 and coord[1] < 30 and coord[0] >= 0 and coord[1] >= 0
+    return (coord[0] < BOARD_WIDTH and coord[1] < BOARD_HEIGHT
+            and coord[0] >= 0 and coord[1] >= 0)
+
+def square_index(coords):
+    return coords[0]*BOARD_HEIGHT + coords[1]
+
+def index_square(index):
+    return (index // BOARD_HEIGHT, index % BOARD_HEIGHT)
+
+EMPTY_SLOT = 0
+CONTESTED_SLOT = -1
+
+class ArraySquaresView(Mapping):
+    '''
+    read only coords -> placeables mapping over an ArrayGameboard, iterating
+    occupied squares in sorted coords order like sorted(Gameboard.squares)
+    '''
+    def __init__(self, cells):
+        self.cells = cells
+
+    def __getitem__(self, coords):
+        if not in_bounds(coords):
+            raise KeyError(coords)
+        return self.cells[square_index(coords)]
+
+    def __iter__(self):
+        for index, placeables in enumerate(self.cells):
+            if placeables:
+                yield index_square(index)
+
+    def __len__(self):
+        return sum(1 for placeables in self.cells if placeables)
+
+    def get(self, coords, default=None):
+        if not in_bounds(coords):
+            return default
+        return self.cells[square_index(coords)]
+
+    def values(self):
+        return [placeables for placeables in self.cells if placeables]
+
+    def items(self):
+        return [(index_square(index), placeables)
+                for index, placeables in enumerate(self.cells) if placeables]
+
+class ArrayGameboard(UuidRegistry, PlacementEvents):
+    '''
+    Gameboard backend for the fixed size board that keeps occupants in flat
+    per-square lists next to three occupancy layers:
+    unit_layer holds the slot of the single unit on a square (EMPTY_SLOT or
+    CONTESTED_SLOT otherwise), resource_layer the summed resource amount and
+    wall_layer the number of walls.
+    '''
+    def __init__(self):
+        self.cells = [[] for i in range(BOARD_AREA)]
+        self.unit_layer = array('l', [EMPTY_SLOT]) * BOARD_AREA
+        self.resource_layer = array('l', [0]) * BOARD_AREA
+        self.wall_layer = array('b', [0]) * BOARD_AREA
+        self.slot_units = dict() # slot to Unit
+        self.unit_slots = dict() # Unit to slot
+        self.next_slot = 1
+        self.contested = set() # indices holding CONTESTED_SLOT
+        self.clear_registry()
+        self.clear_placement_listeners()
+        self.squares = ArraySquaresView(self.cells)
+
+    def covered_indices(self, placeable):
+        return self.indices_at(placeable.coords, placeable.size)
+
+    def indices_at(self, coords, size):
+        if not unit_placement_in_bounds(coords, size):
+            raise Exception("Placeable out of bounds at " + str(coords))
+        corner = square_index(coords)
+        return [corner + i*BOARD_HEIGHT + j
+                for i in range(size) for j in range(size)]
+
+    def update_unit_layer(self, index):
+        units = [p for p in self.cells[index] if p.is_unit()]
+        if len(units) == 0:
+            self.unit_layer[index] = EMPTY_SLOT
+        elif len(units) == 1:
+            self.unit_layer[index] = self.unit_slots[units[0]]
+        else:
+            self.unit_layer[index] = CONTESTED_SLOT
+            self.contested.add(index)
+            return
+        self.contested.discard(index)
+
+    def prune_transporter_clones(self):
+        self.clear_registry()
+        for index, placeables in enumerate(self.cells):
+            for placeable in placeables:
+                if self.get_by_uuid(placeable.uuid) == None:
+                    self.register(placeable)
+            self.cells[index] = [self.get_by_uuid(placeable.uuid)
+                                 for placeable in placeables]
+        self.slot_units = dict()
+        self.unit_slots = dict()
+        for unit in self.placeables():
+            if unit.is_unit():
+                self.unit_slots[unit] = self.next_slot
+                self.slot_units[self.next_slot] = unit
+                self.next_slot += 1
+        for index in range(BOARD_AREA):
+            self.update_unit_layer(index)
+
+    def get_single_occupant(self, square):
+        if not in_bounds(square):
+            return None
+        index = square_index(square)
+        slot = self.unit_layer[index]
+        if self.wall_layer[index] == 0 and slot != CONTESTED_SLOT:
+            return self.slot_units.get(slot, None)
+        occupants = [o for o in self.cells[index] if not o.is_resource_pile()]
+        if len(occupants) == 1:
+            return occupants[0]
+        raise Exception("Multiple occupants found")
+
+    def place(self, placeable):
+        indices = self.covered_indices(placeable)
+        self.register(placeable)
+        if placeable.is_unit() and placeable not in self.unit_slots:
+            self.unit_slots[placeable] = self.next_slot
+            self.slot_units[self.next_slot] = placeable
+            self.next_slot += 1
+        for index in indices:
+            self.cells[index].append(placeable)
+            if placeable.is_unit():
+                if self.unit_layer[index] == EMPTY_SLOT:
+                    self.unit_layer[index] = self.unit_slots[placeable]
+                else:
+                    self.unit_layer[index] = CONTESTED_SLOT
+                    self.contested.add(index)
+            elif placeable.is_resource_pile():
+                self.resource_layer[index] += placeable.amount
+            elif placeable.is_wall():
+                self.wall_layer[index] += 1
+
+    def unplace(self, placeable):
+        for index in self.covered_indices(placeable):
+            if not (placeable in self.cells[index]):
+                raise Exception("Expected placeable not found at " +
+                                str(index_square(index)))
+            self.cells[index].remove(placeable)
+            if placeable.is_unit():
+                if self.unit_layer[index] == CONTESTED_SLOT:
+                    self.update_unit_layer(index)
+                else:
+                    self.unit_layer[index] = EMPTY_SLOT
+            elif placeable.is_resource_pile():
+                self.resource_layer[index] -= placeable.amount
+            elif placeable.is_wall():
+                self.wall_layer[index] -= 1
+        if placeable in self.unit_slots:
+            del self.slot_units[self.unit_slots.pop(placeable)]
+        self.unregister(placeable)
+
+    '''
+    move a unit through the layers directly, keeping its slot, instead of
+    removing and adding it again
+    '''
+    def move_on_board(self, placeable, coords):
+        if not placeable.is_unit():
+            return PlacementEvents.move_on_board(self, placeable, coords)
+        new_indices = self.indices_at(coords, placeable.size)
+        for index in self.covered_indices(placeable):
+            self.cells[index].remove(placeable)
+            if self.unit_layer[index] == CONTESTED_SLOT:
+                self.update_unit_layer(index)
+            else:
+                self.unit_layer[index] = EMPTY_SLOT
+        previous_coords = placeable.coords
+        placeable.coords = coords
+        self.register(placeable) # last added, as if removed and added again
+        slot = self.unit_slots[placeable]
+        for index in new_indices:
+            self.cells[index].append(placeable)
+            if self.unit_layer[index] == EMPTY_SLOT:
+                self.unit_layer[index] = slot
+            else:
+                self.unit_layer[index] = CONTESTED_SLOT
+                self.contested.add(index)
+        self.placement_changed(PlacementEvent.MOVED,
+                               placeable,
+                               previous_coords)
+
+    def units(self):
+        return list(self.unit_slots)
+
+    def conflicts_exist(self):
+        return len(self.contested) > 0
+
+    def contested_squares(self):
+        previous = -1
+        while True:
+            remaining = [index for index in self.contested if index > previous]
+            if len(remaining) == 0:
+                return
+            previous = min(remaining)
+            yield index_square(previous)
+
+    def adding_would_cause_conflict(self, placeable):
+        if self.conflicts_exist():
+            return True
+        if not placeable.is_unit():
+            return False
+        return any(self.unit_layer[index] != EMPTY_SLOT
+                   for index in self.covered_indices(placeable))
+
+    def resource_squares(self, placeable):
+        return [self.cells[index] for index in self.covered_indices(placeable)
+                if self.resource_layer[index] != 0]
+
+    def resource_amount_changed(self, resource_pile):
+        index = square_index(resource_pile.coords)
+        self.resource_layer[index] = sum(p.amount for p in self.cells[index]
+                                         if p.is_resource_pile())
+        self.placement_changed(PlacementEvent.RESOURCE_AMOUNT_CHANGED,
+                               resource_pile)
 
 @dataclass(eq=False)
 class Gamestate:
     gameboard: Gameboard
     players: List[Player]
 
+    def __post_init__(self):
+        self._players = {player.uuid: player for player in self.players}
+
+    '''
+    return the player, placeable or part with the given uuid, or None
+    '''
+    def get_by_uuid(self, uuid):
+        if uuid in self._players:
+            return self._players[uuid]
+        return self.gameboard.get_by_uuid(uuid)
+
+# (shape, path kind, part_size, unit_size, start_coord) to immutable paths,
+# filled on first use and shared by client, server and resolver
+PATH_TABLE = dict()
+
+def frozen_paths(paths):
+    return tuple(tuple(path) for path in paths)
+
 class ShapeType():
     def display_name(self):
         raise Exception("ShapeType superclass has no display name.")
     
     '''
-    move_paths implementations return a list of paths
-    where a path is a list of coords each of which
-    depends on the previous being reachable
+    move_paths returns a tuple of paths built by
+    build_move_paths where a path is a tuple of coords
+    each of which depends on the previous being reachable
     '''
-    def move_paths(self, start_coord, part_size, unit_size) -> list:
-        raise Exception("move_paths called on ShapeType superclass.")
+    def move_paths(self, start_coord, part_size, unit_size) -> tuple:
+        key = (type(self), "move", part_size, unit_size, tuple(start_coord))
+        if key not in PATH_TABLE:
+            PATH_TABLE[key] = frozen_paths(
+                self.build_move_paths(start_coord, part_size, unit_size))
+        return PATH_TABLE[key]
 
     '''
     blast_paths returns the same type of data as
@@ -319,8 +705,18 @@ class ShapeType():
     of blast direction so the king shape returns
     a single path instead of many length 1 paths
     '''
-    def blast_paths(self, start_coord, part_size, unit_size) -> list:
-        return self.move_paths(start_coord, part_size, unit_size)
+    def blast_paths(self, start_coord, part_size, unit_size) -> tuple:
+        key = (type(self), "blast", part_size, unit_size, tuple(start_coord))
+        if key not in PATH_TABLE:
+            PATH_TABLE[key] = frozen_paths(
+                self.build_blast_paths(start_coord, part_size, unit_size))
+        return PATH_TABLE[key]
+
+    def build_move_paths(self, start_coord, part_size, unit_size) -> list:
+        raise Exception("build_move_paths called on ShapeType superclass.")
+
+    def build_blast_paths(self, start_coord, part_size, unit_size) -> list:
+        return self.build_move_paths(start_coord, part_size, unit_size)
 
 def direct_path_move_path(start_coord, part_size, steps, unit_size):
     result = []
@@ -339,7 +735,7 @@ class Bishop(ShapeType):
     def display_name(self):
         return "Bishop"
     
-    def move_paths(self, start_coord, part_size, unit_size):
+    def build_move_paths(self, start_coord, part_size, unit_size):
         return direct_path_move_path(start_coord,
                                      part_size,
                                      [(1, 1), (-1, 1), (1, -1), (-1, -1)],
@@ -349,7 +745,7 @@ class Rook(ShapeType):
     def display_name(self):
         return "Rook"
     
-    def move_paths(self, start_coord, part_size, unit_size):
+    def build_move_paths(self, start_coord, part_size, unit_size):
         return direct_path_move_path(start_coord,
                                      part_size,
                                      [(1, 0), (0, 1), (0, -1), (-1, 0)],
@@ -359,7 +755,7 @@ class Knight(ShapeType):
     def display_name(self):
         return "Knight"
     
-    def move_paths(self, start_coord, part_size, unit_size):
+    def build_move_paths(self, start_coord, part_size, unit_size):
         return direct_path_move_path(start_coord,
                                      part_size,
                                      [(1, 2), (1, -2), (2, 1), (2, -1),
@@ -370,7 +766,7 @@ class King(ShapeType):
     def display_name(self):
         return "King"
     
-    def move_paths(self, start_coord, part_size, unit_size):
+    def build_move_paths(self, start_coord, part_size, unit_size):
         many_paths = []
         for i in range(-part_size, part_size):
             for j in range(-part_size, part_size):
@@ -379,7 +775,7 @@ class King(ShapeType):
                     many_paths.append([(i, j)])
         return many_paths
 
-    def blast_paths(self, start_coord, part_size, unit_size):
+    def build_blast_paths(self, start_coord, part_size, unit_size):
         blast = []
         for i in range(-part_size, part_size+unit_size):
             for j in range(-part_size, part_size+unit_size):
@@ -393,13 +789,19 @@ class Queen(ShapeType):
     def display_name(self):
         return "Queen"
     
-    def move_paths(self, start_coord, part_size, unit_size):
+    def build_move_paths(self, start_coord, part_size, unit_size):
         return direct_path_move_path(start_coord,
                                      part_size,
                                      [(1, 1), (-1, 1), (1, -1), (-1, -1),
                                       (1, 0), (0, 1), (0, -1), (-1, 0)],
                                      unit_size)
-    
+
+SHAPE_OBJECTS = {ShapeTypeEnum.BISHOP: Bishop(),
+                 ShapeTypeEnum.ROOK: Rook(),
+                 ShapeTypeEnum.KNIGHT: Knight(),
+                 ShapeTypeEnum.KING: King(),
+                 ShapeTypeEnum.QUEEN: Queen(),}
+
 @dataclass(eq=False)
 class ResourcePile(Placeable):
     amount: int
@@ -750,33 +1152,25 @@ class Gameturn:
     def align_net_objects(self, gamestate):
         new_dict = {}
         for player, unit_dict in self.players_to_units_to_parts_to_actions.items():
-            replacement_player = None
-            for candidate_player in gamestate.players:
-                if candidate_player == player:
-                    replacement_player = candidate_player
-            if replacement_player == None:
+            replacement_player = gamestate.get_by_uuid(player.uuid)
+            if not isinstance(replacement_player, Player):
                 raise Exception("Expected player not found in gamestate.")
             new_dict[replacement_player] = dict()
             for unit, part_dict in unit_dict.items():
-                placeables = gamestate.gameboard.squares[unit.coords]
-                replacement_unit = None
-                for placeable in placeables:
-                    if placeable == unit:
-                        replacement_unit = placeable
-                if replacement_unit == None:
+                replacement_unit = gamestate.get_by_uuid(unit.uuid)
+                if not isinstance(replacement_unit, Unit):
                     raise Exception("Unit from turn not found on gameboard")
-                new_dict[player][replacement_unit] = dict()
+                new_dict[replacement_player][replacement_unit] = dict()
                 for part, action in part_dict.items():
-                    replacement_part = None
-                    for replacement_candidate in replacement_unit.parts:
-                        if replacement_candidate == part:
-                            replacement_part = replacement_candidate
-                    if replacement_part == None:
+                    replacement_part = gamestate.get_by_uuid(part.uuid)
+                    if replacement_part not in replacement_unit.parts:
                         raise Exception("Expected part not found.")
+                    if action.is_producer():
+                        action.produced_unit = replacement_player.prototype_named(
+                            action.produced_unit.unit_name)
                     new_dict[replacement_player][replacement_unit][replacement_part] = action
 
         self.players_to_units_to_parts_to_actions = new_dict
-                    
 
     def unit_pending_true_max_gain_energy(self, player, unit):
         parts = unit.parts
@@ -795,6 +1189,85 @@ class Gameturn:
 
         return (pending_energy, true_energy, max_energy, gain_energy)
 
+'''
+stand-in for a player, unit or part that only has its uuid, used as a key of
+turns decoded off the wire until align_net_objects replaces it
+'''
+def net_stub(cls, uuid):
+    stub = cls.__new__(cls)
+    stub.uuid = uuid
+    return stub
+
+def prototype_stub(unit_name):
+    stub = net_stub(Unit, None)
+    stub.unit_name = unit_name
+    return stub
+
+@dataclass(eq=False)
+class ProducerActionReference:
+    produced_unit_name: str
+    out_coords: Tuple[int, int]
+
+# same order as ActionType, see ActionReference
+ActionReferenceType = Union['ProducerActionReference',
+                            'ResearcherAction',
+                            'ArmamentAction',
+                            'CollectorAction',
+                            'LocomotorAction']
+
+@dataclass(eq=False)
+class ActionReference:
+    player_uuid: UUID
+    unit_uuid: UUID
+    part_uuid: UUID
+    action: ActionReferenceType
+
+@dataclass(eq=False)
+class GameturnReference:
+    player_uuids: List[UUID] # including players without actions
+    actions: List[ActionReference]
+
+'''
+the wire form of a turn, which refers to players, units and parts by uuid and
+to produced prototypes by name
+'''
+def turn_to_reference(gameturn):
+    actions = []
+    for player, unit_dict in gameturn.players_to_units_to_parts_to_actions.items():
+        for unit, part_dict in unit_dict.items():
+            for part, action in part_dict.items():
+                if action.is_producer():
+                    action = ProducerActionReference(
+                        produced_unit_name=action.produced_unit.unit_name,
+                        out_coords=action.out_coords)
+                actions.append(ActionReference(player_uuid=player.uuid,
+                                               unit_uuid=unit.uuid,
+                                               part_uuid=part.uuid,
+                                               action=action))
+    return GameturnReference(
+        player_uuids=[player.uuid for player
+                      in gameturn.players_to_units_to_parts_to_actions],
+        actions=actions)
+
+'''
+rebuild a turn keyed by net stubs, which align_net_objects resolves against a
+gamestate
+'''
+def turn_from_reference(reference):
+    players = {uuid: net_stub(Player, uuid) for uuid in reference.player_uuids}
+    gameturn = build_gameturn(players.values())
+    for entry in reference.actions:
+        action = entry.action
+        if type(action) is ProducerActionReference:
+            action = producer_action_factory(
+                prototype_stub(action.produced_unit_name),
+                tuple(action.out_coords))
+        gameturn.add_action(players[entry.player_uuid],
+                            net_stub(Unit, entry.unit_uuid),
+                            net_stub(Part, entry.part_uuid),
+                            action)
+    return gameturn
+
 '''
 higher indexed player turns overwrite lower indexed ones if duplicates exist
 '''
@@ -866,7 +1339,8 @@ def advance_gamestate_via_mutation(gamestate, do_turn):
             new_unit.coords = action.out_coords
             new_unit.owner_player_number = unit.owner_player_number
             new_unit.owner_team_number = unit.owner_team_number
-            if not gamestate.gameboard.adding_would_cause_conflict(new_unit):
+            if (unit_placement_in_bounds(new_unit.coords, new_unit.size) and
+                not gamestate.gameboard.adding_would_cause_conflict(new_unit)):
                 gamestate.gameboard.add_to_board(new_unit)
                 part.current_production_points = 0
                 part.under_production = None
@@ -877,18 +1351,12 @@ def advance_gamestate_via_mutation(gamestate, do_turn):
         player.research_amount += part.research_amount()
 
     def do_collection():
-        resource_piles = []
-        covered_coords = []
-        for i in range(unit.size):
-            for j in range(unit.size):
-                covered_coords.append((unit.coords[0]+i,
-                                       unit.coords[1]+j))
         gatherable = part.max_resources_removed_per_turn()
-        for coord in covered_coords:
-            placeables = gamestate.gameboard.squares[coord]
+        for placeables in gamestate.gameboard.resource_squares(unit):
             for placeable in placeables:
                 if placeable.is_resource_pile():
                     gatherable -= placeable.yield_resources(gatherable)
+                    gamestate.gameboard.resource_amount_changed(placeable)
                     if placeable.amount == 0:
                         gamestate.gameboard.remove_from_board(placeable)
         gathered = part.max_resources_removed_per_turn() - gatherable
@@ -900,118 +1368,93 @@ def advance_gamestate_via_mutation(gamestate, do_turn):
     turn_dict = do_turn.players_to_units_to_parts_to_actions
 
     # energy gain
-    charged_parts = set()
-    for placeables in gamestate.gameboard.squares.values():
-        for placeable in placeables:
-            if placeable.is_unit():
-                for part in placeable.parts:
-                    if part.is_core() and part.is_functional():
-                        if part not in charged_parts:
-                            part.charge()
-                            charged_parts.add(part)
-
-    # researchers
-    for player in turn_dict:
-        for unit in turn_dict[player]:
-            for part in unit.parts:
-                if part in turn_dict[player][unit]:
-                    action = turn_dict[player][unit][part]
-                    if (action.is_researcher() and
-                        part.is_functional() and
-                        unit.try_pay_energy(part, action)):
-                        do_research()
-
-    # collectors
-    for player in turn_dict:
-        for unit in turn_dict[player]:
-            for part in unit.parts:
-                if part in turn_dict[player][unit]:
-                    action = turn_dict[player][unit][part]
-                    if (action.is_collector() and
-                        part.is_functional() and
-                        unit.try_pay_energy(part, action)):
-                        do_collection()
-
-    # armaments
-    for player in turn_dict:
-        for unit in turn_dict[player]:
-            for part in unit.parts:
-                if part in turn_dict[player][unit]:
-                    action = turn_dict[player][unit][part]
-                    if (action.is_armament() and
-                        part.is_functional() and
-                        unit.try_pay_energy(part, action)):
-                        do_blast()
-
-    # producers
-    for player in turn_dict:
-        for unit in turn_dict[player]:
+    charged_parts = []
+    for unit in gamestate.gameboard.units():
+        for part in unit.parts:
+            if part.is_core() and part.is_functional():
+                part.charge()
+                charged_parts.append(part)
+
+    # sort actions into phases once, keeping the player, unit, part order
+    # that each phase would see walking turn_dict and unit.parts
+    researches = []
+    collections = []
+    blasts = []
+    productions = []
+    moves = []
+    move_payments = [] # locomotor actions in the order they were added
+    for player, unit_dict in turn_dict.items():
+        for unit, part_dict in unit_dict.items():
             for part in unit.parts:
-                if part in turn_dict[player][unit]:
-                    action = turn_dict[player][unit][part]
-                    if (action.is_producer() and
-                        part.is_functional() and
-                        unit.try_pay_energy(part, action)):
-                        do_production()
+                if part in part_dict:
+                    action = part_dict[part]
+                    entry = (player, unit, part, action)
+                    if action.is_researcher():
+                        researches.append(entry)
+                    elif action.is_collector():
+                        collections.append(entry)
+                    elif action.is_armament():
+                        blasts.append(entry)
+                    elif action.is_producer():
+                        productions.append(entry)
+                    elif action.is_locomotor():
+                        moves.append(entry)
+            for part, action in part_dict.items():
+                if action.is_locomotor():
+                    move_payments.append((player, unit, part, action))
+
+    # researchers, collectors, armaments, then producers
+    for entries, do_phase in [(researches, do_research),
+                              (collections, do_collection),
+                              (blasts, do_blast),
+                              (productions, do_production)]:
+        for player, unit, part, action in entries:
+            if part.is_functional() and unit.try_pay_energy(part, action):
+                do_phase()
 
     # removal of destroyed units
-    for placeables in gamestate.gameboard.squares.values():
-        for placeable in placeables:
-            if placeable.is_unit():
-                if placeable.is_destroyed():
-                    gamestate.gameboard.remove_from_board(placeable)
-                    for player in turn_dict:
-                        if placeable in turn_dict[player]:
-                            del turn_dict[player][placeable]
+    destroyed_units = set()
+    for unit in gamestate.gameboard.units():
+        if unit.is_destroyed():
+            gamestate.gameboard.remove_from_board(unit)
+            destroyed_units.add(unit)
 
     ### movement ###
+    def destination():
+        return (unit.coords[0] + action.move_target[0],
+                unit.coords[1] + action.move_target[1])
+
     start_squares = {}
-    blocked_squares = set()
     stationary_units = set()
     moving_units = set()
-    #fill moving_units
-    for player in turn_dict:
-        for unit in turn_dict[player]:
-            for part in turn_dict[player][unit]:
-                action = turn_dict[player][unit][part]
-                if (action.is_locomotor() and
-                    part.is_functional() and
-                    unit.try_pay_energy(part, action)):
-                    moving_units.add(unit)
-
-    #fill blocked_squares and start_squares and stationary_units
-    for coords, placeables in gamestate.gameboard.squares.items():
-        for placeable in placeables:
-            if placeable.is_unit():
-                start_squares[placeable] = placeable.coords
-                if placeable not in moving_units:
-                    stationary_units.add(placeable)
-                    blocked_squares.add(coords)
-                    continue
-            if placeable.is_wall():
-                blocked_squares.add(coords)
+    #fill moving_units; moves off the board are ignored and cost nothing
+    for player, unit, part, action in move_payments:
+        if (unit not in destroyed_units and
+            part.is_functional() and
+            unit_placement_in_bounds(destination(), unit.size) and
+            unit.try_pay_energy(part, action)):
+            moving_units.add(unit)
+
+    #fill start_squares and stationary_units
+    for unit in gamestate.gameboard.units():
+        start_squares[unit] = unit.coords
+        if unit not in moving_units:
+            stationary_units.add(unit)
 
     def path_clear():
-        return True # TODO
+        return True # TODO: check the path's squares on gamestate.gameboard
 
     # move all units to their destination if not blocked
-    for player in turn_dict:
-        for unit in turn_dict[player]:
-            for part in unit.parts:
-                if part in turn_dict[player][unit]:
-                    action = turn_dict[player][unit][part]
-                    if action.is_locomotor() and unit in moving_units:
-                        if path_clear():
-                            gamestate.gameboard.remove_from_board(unit)
-                            unit.coords = ((unit.coords[0]
-                                               + action.move_target[0]),
-                                           (unit.coords[1]
-                                               + action.move_target[1]))
-                            gamestate.gameboard.add_to_board(unit)
+    for player, unit, part, action in moves:
+        if (unit in moving_units and
+            path_clear() and
+            unit_placement_in_bounds(destination(), unit.size)):
+            gamestate.gameboard.move_on_board(unit, destination())
 
     while gamestate.gameboard.conflicts_exist():
         # while overlap exists, unmove everyone but the highest priority unit
-        for coords, placeables in sorted(gamestate.gameboard.squares.items()):
+        for coords in gamestate.gameboard.contested_squares():
+            placeables = gamestate.gameboard.squares[coords]
             units = [p for p in placeables if p.is_unit()]
             if len(units) <= 1:
                 continue
@@ -1021,9 +1464,7 @@ def advance_gamestate_via_mutation(gamestate, do_turn):
             units.remove(highest_priority) # the highest priority unit can stay
             for unit in units:
                 # others' movements fail
-                gamestate.gameboard.remove_from_board(unit)
-                unit.coords = start_squares[unit]
-                gamestate.gameboard.add_to_board(unit)
+                gamestate.gameboard.move_on_board(unit, start_squares[unit])
                 moving_units.remove(unit)
                 stationary_units.add(unit)
     ### end movement ###
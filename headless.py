@@ -0,0 +1,222 @@
+'''
+Runs matches between two teams without pygame, crochet or networking, e.g.
+
+    python headless.py monsters_1 test_team_1 --turns 1000 --seed 0
+'''
+import sys
+import time
+import random
+import argparse
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import gameplay
+import game_io
+import arenas
+
+
+def seed_uuids(player, seed):
+    rng = random.Random(seed)
+    player.evolve_uuid(rng.getrandbits(64))
+    player.unit_prototypes.sort(key=lambda unit: unit.unit_name)
+    for prototype in player.unit_prototypes:
+        prototype.evolve_uuid(rng.getrandbits(64))
+        for part in prototype.parts:
+            part.evolve_uuid(rng.getrandbits(64))
+
+'''
+load teams as players 1, 2, ... with uuids derived from seed, so the same
+teams and seed always play out the same match
+'''
+def load_players(team_names, seed, team_loader=game_io.player_from_team):
+    players = []
+    for number, team_name in enumerate(team_names, start=1):
+        player = team_loader(team_name)
+        player.player_number = number
+        player.team_number = number
+        seed_uuids(player, seed*len(team_names) + number)
+        players.append(player)
+    return players
+
+def build_match(team_names,
+                seed,
+                board_factory=gameplay.Gameboard,
+                team_loader=game_io.player_from_team):
+    return arenas.first_arena(load_players(team_names, seed, team_loader),
+                              board_factory())
+
+def owned_units(gamestate, player):
+    return sorted([unit for unit in gamestate.gameboard.units()
+                   if unit.owner_player_number == player.player_number],
+                  key=lambda unit: int(unit.uuid))
+
+
+### turn generators: (gamestate, player, rng) -> Gameturn ###
+
+def idle_turn(gamestate, player, rng):
+    return gameplay.build_gameturn([player])
+
+'''
+research, collect and keep producing the first affordable prototype
+'''
+def economy_turn(gamestate, player, rng):
+    turn = gameplay.build_gameturn([player])
+    for unit in owned_units(gamestate, player):
+        for part in unit.parts:
+            if not part.is_functional():
+                continue
+            if part.is_researcher():
+                turn.add_action(player, unit, part,
+                                gameplay.researcher_action_factory())
+            elif part.is_collector():
+                turn.add_action(player, unit, part,
+                                gameplay.collector_action_factory())
+            elif part.is_producer():
+                action = production_action(gamestate, player, unit, part, rng,
+                                           choose=lambda options: options[0])
+                if action != None:
+                    turn.add_action(player, unit, part, action)
+    return turn
+
+'''
+every functional part acts with probability activity, choosing uniformly
+among its legal targets
+'''
+def random_turn(gamestate, player, rng, activity=0.7):
+    turn = gameplay.build_gameturn([player])
+    for unit in owned_units(gamestate, player):
+        for part in unit.parts:
+            if not part.is_functional() or rng.random() > activity:
+                continue
+            action = None
+            if part.is_researcher():
+                action = gameplay.researcher_action_factory()
+            elif part.is_collector():
+                action = gameplay.collector_action_factory()
+            elif part.is_armament():
+                shape = gameplay.shape_enum_to_object(part.shape_type)
+                blast_paths = shape.blast_paths(unit.coords,
+                                                part.size,
+                                                unit.size)
+                action = gameplay.armament_action_factory(
+                    rng.randrange(len(blast_paths)))
+            elif part.is_locomotor():
+                shape = gameplay.shape_enum_to_object(part.shape_type)
+                squares = [square for path in shape.move_paths(unit.coords,
+                                                               part.size,
+                                                               unit.size)
+                           for square in path]
+                if len(squares) > 0:
+                    target = rng.choice(squares)
+                    action = gameplay.locomotor_action_factory(
+                        (target[0] - unit.coords[0],
+                         target[1] - unit.coords[1]))
+            elif part.is_producer():
+                action = production_action(gamestate, player, unit, part, rng,
+                                           choose=rng.choice)
+            if action != None:
+                turn.add_action(player, unit, part, action)
+    return turn
+
+def production_action(gamestate, player, unit, part, rng, choose):
+    options = [prototype for prototype in player.unit_prototypes
+               if prototype == part.under_production or
+               gameplay.unit_production_legal(unit, prototype, player)]
+    if len(options) == 0:
+        return None
+    prototype = choose(options)
+    spawn_coords = sorted(part.spawn_coords(unit.coords,
+                                            unit.size,
+                                            prototype.size))
+    if len(spawn_coords) == 0:
+        return None
+    return gameplay.producer_action_factory(prototype, rng.choice(spawn_coords))
+
+TURN_GENERATORS = {"idle": idle_turn,
+                   "economy": economy_turn,
+                   "random": random_turn,}
+
+
+@dataclass(eq=False)
+class MatchResult:
+    turns: int
+    seconds: float
+    winner_player_number: Optional[int] # None for a draw
+    resource_amounts: Dict[int, float]
+    research_amounts: Dict[int, int]
+    unit_counts: Dict[int, int]
+
+    def turns_per_second(self):
+        return self.turns / self.seconds if self.seconds > 0 else 0.0
+
+def surviving_players(gamestate):
+    return [player for player in gamestate.players
+            if len(owned_units(gamestate, player)) > 0]
+
+'''
+play until one player has units left or max_turns have been played; the
+seconds reported only cover turn generation and resolution
+'''
+def run_match(gamestate, turn_generators, max_turns, seed):
+    rng = random.Random(seed)
+    turns = 0
+    start = time.perf_counter()
+    while turns < max_turns and len(surviving_players(gamestate)) > 1:
+        player_turns = [generator(gamestate, player, rng) for
+                        player, generator in zip(gamestate.players,
+                                                 turn_generators)]
+        merged_turn = gameplay.merge_turns(player_turns)
+        gameplay.advance_gamestate_via_mutation(gamestate, merged_turn)
+        turns += 1
+    seconds = time.perf_counter() - start
+
+    survivors = surviving_players(gamestate)
+    winner = survivors[0].player_number if len(survivors) == 1 else None
+    return MatchResult(
+        turns=turns,
+        seconds=seconds,
+        winner_player_number=winner,
+        resource_amounts={player.player_number: player.resource_amount
+                          for player in gamestate.players},
+        research_amounts={player.player_number: player.research_amount
+                          for player in gamestate.players},
+        unit_counts={player.player_number: len(owned_units(gamestate, player))
+                     for player in gamestate.players})
+
+
+BOARDS = {"dict": gameplay.Gameboard,
+          "array": gameplay.ArrayGameboard,}
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description="Run headless matches.")
+    parser.add_argument("teams", nargs=2)
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--matches", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--generators", nargs=2, default=["random", "random"],
+                        choices=sorted(TURN_GENERATORS))
+    parser.add_argument("--board", default="dict", choices=sorted(BOARDS))
+    options = parser.parse_args(arguments)
+
+    generators = [TURN_GENERATORS[name] for name in options.generators]
+    total_turns = 0
+    total_seconds = 0
+    for match in range(options.matches):
+        seed = options.seed + match
+        gamestate = build_match(options.teams, seed, BOARDS[options.board])
+        result = run_match(gamestate, generators, options.turns, seed)
+        total_turns += result.turns
+        total_seconds += result.seconds
+        print("Match " + str(match) + " (seed " + str(seed) + "): " +
+              str(result.turns) + " turns, winner: " +
+              str(result.winner_player_number) + ", units: " +
+              str(result.unit_counts) + ", " +
+              "%.1f turns/second" % result.turns_per_second())
+    if total_seconds > 0:
+        print("Overall: %d turns, %.1f turns/second" %
+              (total_turns, total_turns / total_seconds))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
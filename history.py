@@ -0,0 +1,249 @@
+import copy
+import pickle
+import struct
+import bisect
+
+import gameplay
+
+# attributes frozen separately from the object holding them
+FROZEN_ELSEWHERE = ["parts", "unit_prototypes"]
+
+def shallow_state(entity):
+    return tuple((key, value) for key, value in vars(entity).items()
+                 if key not in FROZEN_ELSEWHERE)
+
+
+class GamestateRecord:
+    '''
+    The gamestate after every turn so far.  Each turn keeps frozen copies of
+    its players, placeables and parts, and a copy is only made when the object
+    changed since the previous turn, so unchanged objects are shared between
+    turns.  Unit prototypes are never mutated by gameplay and are frozen once
+    per player.
+    '''
+    def __init__(self, starting_gamestate):
+        self.board_class = type(starting_gamestate.gameboard)
+        self.snapshots = [] # per turn, (frozen players, frozen placeables)
+        self.frozen = dict() # uuid to (state, frozen copy) as of the last turn
+        self.frozen_prototypes = dict() # player uuid to frozen prototypes
+        self.append(starting_gamestate)
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    '''
+    return a fresh, fully independent gamestate as of the turn_index
+    '''
+    def __getitem__(self, turn_index):
+        players, placeables = copy.deepcopy(self.snapshots[turn_index])
+        gameboard = self.board_class()
+        for placeable in placeables:
+            gameboard.add_to_board(placeable)
+        return gameplay.Gamestate(gameboard=gameboard, players=list(players))
+
+    '''
+    reuse the previous turn's frozen copy of entity if its state is unchanged
+    '''
+    def freeze(self, entity, state, frozen, make_frozen):
+        previous = self.frozen.get(entity.uuid, None)
+        if previous != None and previous[0] == state:
+            result = previous[1]
+        else:
+            result = make_frozen()
+        frozen[entity.uuid] = (state, result)
+        return result
+
+    def freeze_player(self, player, frozen):
+        if player.uuid not in self.frozen_prototypes:
+            self.frozen_prototypes[player.uuid] = copy.deepcopy(
+                player.unit_prototypes)
+
+        def make_frozen():
+            frozen_player = copy.copy(player)
+            frozen_player.unit_prototypes = self.frozen_prototypes[player.uuid]
+            return frozen_player
+
+        return self.freeze(player, shallow_state(player), frozen, make_frozen)
+
+    def freeze_placeable(self, placeable, frozen):
+        state = shallow_state(placeable)
+        frozen_parts = None
+        if placeable.is_unit():
+            frozen_parts = [self.freeze(part,
+                                        shallow_state(part),
+                                        frozen,
+                                        lambda part=part: copy.copy(part))
+                            for part in placeable.parts]
+            state += tuple(id(part) for part in frozen_parts)
+
+        def make_frozen():
+            frozen_placeable = copy.copy(placeable)
+            if frozen_parts != None:
+                frozen_placeable.parts = frozen_parts
+            return frozen_placeable
+
+        return self.freeze(placeable, state, frozen, make_frozen)
+
+    def append(self, gamestate, turn=None):
+        frozen = dict()
+        players = tuple(self.freeze_player(player, frozen)
+                        for player in gamestate.players)
+        placeables = tuple(self.freeze_placeable(placeable, frozen)
+                           for placeable in gamestate.gameboard.placeables())
+        self.frozen = frozen
+        self.snapshots.append((players, placeables))
+
+
+'''
+a turn's actions as (player uuid, unit uuid, part uuid, action) entries
+'''
+def encode_turn(gameturn):
+    return [(player.uuid, unit.uuid, part.uuid, action)
+            for player, unit_dict
+            in gameturn.players_to_units_to_parts_to_actions.items()
+            for unit, part_dict in unit_dict.items()
+            for part, action in part_dict.items()]
+
+def decode_turn(entries, gamestate):
+    turn = gameplay.build_gameturn([])
+    for player_uuid, unit_uuid, part_uuid, action in entries:
+        player = gamestate.get_by_uuid(player_uuid)
+        unit = gamestate.get_by_uuid(unit_uuid)
+        part = gamestate.get_by_uuid(part_uuid)
+        if player == None or unit == None or part == None:
+            raise Exception("Logged turn refers to an object not in the " +
+                            "gamestate.")
+        if not turn.contains_player(player):
+            turn[player] = dict()
+        turn.add_action(player, unit, part, action)
+    return turn
+
+'''
+uuid to shallow state of every player, placeable and part in gamestate
+'''
+def entity_states(gamestate):
+    states = dict()
+    for player in gamestate.players:
+        states[player.uuid] = shallow_state(player)
+    for placeable in gamestate.gameboard.placeables():
+        state = shallow_state(placeable)
+        if placeable.is_unit():
+            for part in placeable.parts:
+                states[part.uuid] = shallow_state(part)
+            state += (("parts", tuple(part.uuid for part in placeable.parts)),)
+        states[placeable.uuid] = state
+    return states
+
+'''
+return (changed, removed) where changed maps uuid to new shallow state
+'''
+def state_delta(old_states, new_states):
+    changed = {uuid: state for uuid, state in new_states.items()
+               if old_states.get(uuid, None) != state}
+    removed = [uuid for uuid in old_states if uuid not in new_states]
+    return (changed, removed)
+
+
+FRAME_HEADER = struct.Struct(">I")
+
+class TurnLog:
+    '''
+    Append-only on-disk history.  Every turn is logged as the merged turn
+    that produced it plus the state delta it caused, and every
+    keyframe_interval turns the full gamestate is logged as a keyframe.
+    Any turn is rebuilt by loading the nearest earlier keyframe and
+    replaying the logged turns forward, so memory use does not grow with
+    game length.  Passing no starting_gamestate reopens an existing log.
+    '''
+    def __init__(self, path, starting_gamestate=None, keyframe_interval=50):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.turn_offsets = [None] # turn index to offset of its turn frame
+        self.keyframe_indices = []
+        self.keyframe_offsets = []
+        self.states = None
+        if starting_gamestate == None:
+            self.scan()
+            self.file = open(path, "ab")
+        else:
+            self.file = open(path, "wb")
+            self.size = 0
+            self.write_keyframe(0, starting_gamestate)
+            self.states = entity_states(starting_gamestate)
+
+    def __len__(self):
+        return len(self.turn_offsets)
+
+    def __getitem__(self, turn_index):
+        return self.seek(turn_index)
+
+    def close(self):
+        self.file.close()
+
+    def write_frame(self, record):
+        offset = self.size
+        data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        self.file.write(FRAME_HEADER.pack(len(data)))
+        self.file.write(data)
+        self.file.flush()
+        self.size += FRAME_HEADER.size + len(data)
+        return offset
+
+    def read_frame(self, file, offset):
+        file.seek(offset)
+        length = FRAME_HEADER.unpack(file.read(FRAME_HEADER.size))[0]
+        return pickle.loads(file.read(length))
+
+    def write_keyframe(self, turn_index, gamestate):
+        offset = self.write_frame(("keyframe", turn_index, gamestate))
+        self.keyframe_indices.append(turn_index)
+        self.keyframe_offsets.append(offset)
+
+    def scan(self):
+        with open(self.path, "rb") as file:
+            self.size = file.seek(0, 2)
+            offset = 0
+            while offset < self.size:
+                record = self.read_frame(file, offset)
+                if record[0] == "keyframe":
+                    self.keyframe_indices.append(record[1])
+                    self.keyframe_offsets.append(offset)
+                else:
+                    self.turn_offsets.append(offset)
+                offset = file.tell()
+
+    '''
+    log the turn that was just applied to produce gamestate
+    '''
+    def append(self, gamestate, turn):
+        if self.states == None:
+            self.states = entity_states(self.seek(len(self)-1))
+        turn_index = len(self)
+        new_states = entity_states(gamestate)
+        delta = state_delta(self.states, new_states)
+        self.turn_offsets.append(self.write_frame(
+            ("turn", turn_index, encode_turn(turn), delta)))
+        self.states = new_states
+        if turn_index % self.keyframe_interval == 0:
+            self.write_keyframe(turn_index, gamestate)
+
+    '''
+    return (changed, removed) for the turn, see state_delta
+    '''
+    def delta(self, turn_index):
+        with open(self.path, "rb") as file:
+            return self.read_frame(file, self.turn_offsets[turn_index])[3]
+
+    def seek(self, turn_index):
+        if not (0 <= turn_index < len(self)):
+            raise Exception("Turn " + str(turn_index) + " not in log.")
+        position = bisect.bisect_right(self.keyframe_indices, turn_index) - 1
+        keyframe_index = self.keyframe_indices[position]
+        with open(self.path, "rb") as file:
+            gamestate = self.read_frame(file,
+                                        self.keyframe_offsets[position])[2]
+            for index in range(keyframe_index+1, turn_index+1):
+                entries = self.read_frame(file, self.turn_offsets[index])[2]
+                turn = decode_turn(entries, gamestate)
+                gameplay.advance_gamestate_via_mutation(gamestate, turn)
+        return gamestate
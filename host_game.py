@@ -1,55 +1,96 @@
+import sys
+import argparse
+
 import jsons
 
 from twisted.internet.protocol import Factory
 from twisted.internet.endpoints import TCP4ServerEndpoint
-from twisted.internet import reactor
+from twisted.internet import reactor, task
 from twisted.protocols.basic import NetstringReceiver
 
 import gameplay
 import gameflow
 import messages
+import server_state
+import wire
 
 from dataclasses import dataclass
 from typing import List
 
-class ServerState:
-    def __init__(self):
-        self.players = list()
-        self.turns = list()
-        self.starting_gamestate = None
-serverState = ServerState()
+lobby = server_state.Lobby()
     
 class HostProtocol(NetstringReceiver):
     
     def connectionMade(self):
         print ("Connection made")
 
-    def encodeAndSendString(self, string):
-        self.sendString(bytes(string, "utf-8"))
-
     def connectionLost(self, reason):
         print("connection lost")
 
+    '''
+    a request the host cannot handle is answered with an ErrorResponse
+    rather than by dropping the connection, which the client would only
+    reconnect to and send the request again
+    '''
     def stringReceived(self, data):
         print("stringReceived")
-        self.stringDecoded(str(data, 'utf-8'))
-
-    def stringDecoded(self, string):
-        message_container = jsons.loads(string, cls=messages.MessageContainer)
-        message = jsons.loads(message_container.message,
-                              cls=message_container.message_type)
-        print(type(message))
-        response_body = message.handle_on_server(serverState)
-        response = messages.MessageContainer(
-            message=jsons.dumps(response_body),
-            message_type=response_body.message_type())
-        self.encodeAndSendString(jsons.dumps(response))
+        request_id = None
+        match_id = None
+        wire_format = wire.wire_format_of(data)
+        try:
+            message_container, message, wire_format = wire.decode_message(
+                data,
+                decode_turns=False)
+            print(type(message))
+            request_id = message_container.request_id
+            match_id = message_container.match_id
+            server = lobby.match(match_id, create=message.opens_match())
+            match_id = server.match_id
+
+            def reply(response_body):
+                self.sendString(wire.encode_message(response_body,
+                                                    request_id,
+                                                    wire_format,
+                                                    server.match_id))
+
+            message.respond_on_server(server, reply)
+        except Exception as error:
+            print("Error: " + str(error))
+            self.sendString(wire.encode_message(
+                messages.ErrorResponse(error=str(error)),
+                request_id,
+                wire_format,
+                match_id))
 
 class HostProtocolFactory(Factory):
     def buildProtocol(self, addr):
         return HostProtocol()
     
-# 8007 is the port you want to run under. Choose something >1024
-endpoint = TCP4ServerEndpoint(reactor, 8007)
-endpoint.listen(HostProtocolFactory())
-reactor.run()
+def main(arguments):
+    parser = argparse.ArgumentParser(description="Host games.")
+    # the port you want to run under. Choose something >1024
+    parser.add_argument("--port", type=int, default=8007)
+    parser.add_argument("--interface", default="")
+    parser.add_argument("--hot-turns", type=int,
+                        default=server_state.HOT_TURNS,
+                        help="turns per match kept in memory")
+    parser.add_argument("--turn-log-directory", default=None,
+                        help="where older turns are kept, default temp files")
+    parser.add_argument("--max-idle-seconds", type=float,
+                        default=server_state.MAX_IDLE_SECONDS,
+                        help="free matches idle for this long")
+    options = parser.parse_args(arguments)
+    global lobby
+    lobby = server_state.Lobby(options.turn_log_directory, options.hot_turns)
+    task.LoopingCall(lobby.free_idle_matches,
+                     options.max_idle_seconds).start(
+                         options.max_idle_seconds / 10,
+                         now=False)
+    endpoint = TCP4ServerEndpoint(reactor,
+                                  options.port,
+                                  interface=options.interface)
+    endpoint.listen(HostProtocolFactory())
+    reactor.run()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -4,11 +4,24 @@ import game_io
 import game
 import gameflow
 
+import sys
 import time
+import argparse
 
 import crochet
 
+parser = argparse.ArgumentParser(description="Join a game.")
+parser.add_argument("--host", default=networking.HOST)
+parser.add_argument("--port", type=int, default=networking.PORT)
+parser.add_argument("--match", default=None,
+                    help="match to join or create, by default any open match")
+parser.add_argument("--wire-format", default=networking.WIRE_FORMAT,
+                    choices=["jsons", "binary"])
+options = parser.parse_args(sys.argv[1:])
+
 crochet.setup()
+networking.configure(options.host, options.port, options.wire_format)
+networking.join_match(options.match)
 
 team_name = input("Welcome.  Please input your team name: ")
 me = game_io.player_from_team(team_name)
@@ -16,6 +29,8 @@ me = game_io.player_from_team(team_name)
 welcome_response = networking.wait_for_response(messages.WelcomeRequest(me=me))
 me.player_number = welcome_response.player_number
 me.team_number = welcome_response.team_number
+networking.join_match(welcome_response.match_id)
+print("Joined match " + welcome_response.match_id)
 
 internet_gameflow = None
 
@@ -0,0 +1,222 @@
+'''
+Load test for a host on localhost.  Starts a host process, then runs
+simulated clients in pairs, each pair in its own match: both clients join,
+one starts the match, and both report and wait for turns at the given rate.
+Reports request latency percentiles, throughput and the host's CPU and
+memory use, e.g.
+
+    python load_test.py --clients 200 --turns 50 --rate 2 --host twisted
+
+Every client runs in this one process, so latencies include the time the
+clients spend decoding responses; in the jsons wire format decoding the
+starting gamestates dominates the latency of the first requests.
+'''
+import os
+import sys
+import copy
+import time
+import random
+import socket
+import asyncio
+import argparse
+import resource
+import subprocess
+import statistics
+
+import gameplay
+import game_io
+import headless
+import messages
+import async_networking
+
+HOSTS = {"twisted": "host_game.py",
+         "asyncio": "async_networking.py",}
+
+
+class LatencyLog:
+    def __init__(self):
+        self.latencies = dict() # message type to seconds per request
+
+    async def timed_request(self, connection, message):
+        start = time.perf_counter()
+        response = await connection.wait_for_response(message)
+        self.latencies.setdefault(message.message_type(), []).append(
+            time.perf_counter() - start)
+        return response
+
+    def all_latencies(self):
+        return [latency for latencies in self.latencies.values()
+                for latency in latencies]
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+'''
+one client: join, have the second client of the match start it, wait for the
+starting gamestate and play turns, each taking at least 1/rate seconds
+'''
+async def run_client(number, options, player, first_joined, log):
+    connection = async_networking.AsyncServerConnection(
+        "127.0.0.1",
+        options.port,
+        wire_format=options.wire_format,
+        match_id="load-" + str(number // 2))
+    if number % 2 == 1:
+        await first_joined.wait()
+    welcome = await log.timed_request(connection,
+                                      messages.WelcomeRequest(me=player))
+    player.player_number = welcome.player_number
+    player.team_number = welcome.team_number
+    if number % 2 == 0:
+        first_joined.set()
+    else:
+        await log.timed_request(connection, messages.StartGameRequest())
+
+    gamestate = None
+    while gamestate == None:
+        poll_response = await log.timed_request(
+            connection, messages.GameStartPollRequest())
+        gamestate = poll_response.gamestate
+        if gamestate == None:
+            await asyncio.sleep(0.1)
+
+    generator = headless.TURN_GENERATORS[options.generator]
+    rng = random.Random(number)
+    interval = 1 / options.rate if options.rate > 0 else 0
+    for turn_index in range(options.turns):
+        start = time.perf_counter()
+        me = [p for p in gamestate.players
+              if p.player_number == player.player_number][0]
+        await log.timed_request(connection, messages.ReportTurnRequest(
+            gameturn=generator(gamestate, me, rng),
+            turn_index=turn_index))
+        response = await log.timed_request(
+            connection, messages.TurnSubscribeRequest(turn_index=turn_index))
+        if options.generator != "idle":
+            gameplay.advance_gamestate_via_mutation(gamestate,
+                                                    response.gameturn)
+        await asyncio.sleep(max(0, interval - (time.perf_counter() - start)))
+    await connection.close()
+
+async def run_clients(options, players):
+    log = LatencyLog()
+    first_joined = [asyncio.Event() for i in range(len(players) // 2)]
+    start = time.perf_counter()
+    await asyncio.gather(*[run_client(number,
+                                      options,
+                                      player,
+                                      first_joined[number // 2],
+                                      log)
+                           for number, player in enumerate(players)])
+    return (log, time.perf_counter() - start)
+
+
+### host process ###
+
+def start_host(options):
+    process = subprocess.Popen([sys.executable,
+                                HOSTS[options.host],
+                                "--port",
+                                str(options.port)],
+                               stdout=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            with socket_to(options.port):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise Exception("Host did not start listening on port " +
+                    str(options.port) + ".")
+
+def socket_to(port):
+    return socket.create_connection(("127.0.0.1", port), timeout=1)
+
+'''
+(cpu seconds, resident kilobytes, peak resident kilobytes) of a running
+process, from /proc, or None where /proc is not available
+'''
+def process_usage(pid):
+    try:
+        with open("/proc/" + str(pid) + "/stat") as file:
+            stat = file.read().rsplit(")", 1)[1].split()
+        with open("/proc/" + str(pid) + "/status") as file:
+            status = dict(line.split(":", 1) for line in file if ":" in line)
+    except OSError:
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu_seconds = (int(stat[11]) + int(stat[12])) / ticks
+    return (cpu_seconds,
+            int(status["VmRSS"].split()[0]),
+            int(status["VmHWM"].split()[0]))
+
+def load_players(options):
+    prototype = game_io.player_from_team(options.team)
+    players = []
+    for number in range(options.clients):
+        player = copy.deepcopy(prototype)
+        headless.seed_uuids(player, number)
+        players.append(player)
+    return players
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description="Load test a local host.")
+    parser.add_argument("--clients", type=int, default=20,
+                        help="simulated clients, two per match")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=1.0,
+                        help="turns per second per client, 0 for no limit")
+    parser.add_argument("--generator", default="idle",
+                        choices=sorted(headless.TURN_GENERATORS))
+    parser.add_argument("--host", default="twisted", choices=sorted(HOSTS))
+    parser.add_argument("--port", type=int, default=8017)
+    parser.add_argument("--wire-format", default="jsons",
+                        choices=["jsons", "binary"])
+    parser.add_argument("--team", default="monsters_1")
+    options = parser.parse_args(arguments)
+    if options.clients % 2 != 0:
+        raise Exception("Clients play in pairs; use an even --clients.")
+
+    players = load_players(options)
+    process = start_host(options)
+    try:
+        usage_before = process_usage(process.pid)
+        log, seconds = asyncio.run(run_clients(options, players))
+        usage_after = process_usage(process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+
+    latencies = log.all_latencies()
+    print("%d clients, %d turns each, %d requests in %.2f seconds "
+          "(%.1f requests/second)" % (options.clients, options.turns,
+                                      len(latencies), seconds,
+                                      len(latencies) / seconds))
+    print("%-32s %8s %10s %10s %10s" % ("request", "count", "p50 ms",
+                                        "p99 ms", "mean ms"))
+    for message_type, values in sorted(log.latencies.items()):
+        print("%-32s %8d %10.2f %10.2f %10.2f" %
+              (message_type, len(values), percentile(values, 0.5) * 1000,
+               percentile(values, 0.99) * 1000,
+               statistics.mean(values) * 1000))
+    print("%-32s %8d %10.2f %10.2f %10.2f" %
+          ("all", len(latencies), percentile(latencies, 0.5) * 1000,
+           percentile(latencies, 0.99) * 1000,
+           statistics.mean(latencies) * 1000))
+
+    if usage_before != None and usage_after != None:
+        cpu_seconds = usage_after[0] - usage_before[0]
+        print("host: %.2f cpu seconds (%.0f%% of one core), %d kB resident, "
+              "%d kB peak" % (cpu_seconds, 100 * cpu_seconds / seconds,
+                              usage_after[1], usage_after[2]))
+    else:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        print("host: %.2f cpu seconds, %d kB peak resident" %
+              (usage.ru_utime + usage.ru_stime, usage.ru_maxrss))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,5 +1,5 @@
 import gameplay
-import gameflow
+import arenas
 
 from dataclasses import dataclass
 from typing import Optional, Type
@@ -10,25 +10,49 @@ class Message:
     def message_type(self):
         raise Exception("message_type called on Message superclass")
 
+    '''
+    reply(response) sends a response to the client, and may be called later
+    than this returns; by default the response from handle_on_server is sent
+    straight away
+    '''
+    def respond_on_server(self, server, reply):
+        reply(self.handle_on_server(server))
+
+    '''
+    whether the host creates the match this message names if it does not
+    have it yet, see server_state.Lobby
+    '''
+    def opens_match(self):
+        return False
+
 @dataclass(eq=False)
 class MessageContainer:
     message: str
     message_type: str
+    request_id: Optional[int] = None # echoed back in the response
+    match_id: Optional[str] = None # see server_state.Lobby
 
 @dataclass(eq=False)
 class WelcomeRequest(Message):
     me: gameplay.Player
 
     def handle_on_server(self, server):
+        if not server.open_to_players():
+            raise Exception("Match " + str(server.match_id) + " cannot " +
+                            "take more players.")
         server.players.append(self.me)
         player_number = len(server.players)
         print("Assigned a player number: " + str(len(server.players)))
         self.me.player_number = player_number
         self.me.team_number = player_number
         response = WelcomeResponse(player_number=player_number,
-                                   team_number=player_number)
+                                   team_number=player_number,
+                                   match_id=server.match_id)
         return response
 
+    def opens_match(self):
+        return True
+
     def message_type(self):
         return "messages.WelcomeRequest"
 
@@ -36,6 +60,7 @@ class WelcomeRequest(Message):
 class WelcomeResponse(Message):
     player_number: int
     team_number: int
+    match_id: str # to send with every later message
 
     def message_type(self):
         return "messages.WelcomeResponse"
@@ -45,7 +70,7 @@ class StartGameRequest(Message):
 
     def handle_on_server(self, server):
         if (server.starting_gamestate == None):
-            server.starting_gamestate = gameflow.first_arena(server.players)
+            server.starting_gamestate = arenas.first_arena(server.players)
         response = StartGameResponse()
         return response
 
@@ -81,17 +106,26 @@ class ReportTurnRequest(Message):
 
     def handle_on_server(self, server):
         print(self.turn_index)
+        check_turn_index(self.turn_index)
         if (len(server.turns) == self.turn_index):
-            server.turns.append(gameplay.build_gameturn([]))
+            server.turns.append(None)
         elif self.turn_index > len(server.turns):
             raise Exception("Turn index " + str(self.turn_index) + "is two " +
                             "or more turns into the future.")
 
+        # on the host turns stay encoded, see wire.EncodedGameturn
         existing_turn = server.turns[self.turn_index]
-        
-        server.turns[self.turn_index] = gameplay.merge_turns([existing_turn,
-                                                              self.gameturn])
-        
+        if existing_turn == None:
+            merged_turn = self.gameturn
+        else:
+            merged_turn = existing_turn.merged(self.gameturn)
+        server.turns[self.turn_index] = merged_turn
+
+        if turn_complete(server, merged_turn):
+            for reply in server.turn_subscribers.pop(self.turn_index, []):
+                reply(TurnSubscribeResponse(gameturn=merged_turn,
+                                            turn_index=self.turn_index))
+
         response = ReportTurnResponse()
         return response
     
@@ -109,20 +143,15 @@ class TurnPollRequest(Message):
 
     def handle_on_server(self, server):
         print(self.turn_index)
+        check_turn_index(self.turn_index)
         if (len(server.turns) == self.turn_index):
-            server.turns.append(gameplay.build_gameturn([]))
+            server.turns.append(None)
         elif self.turn_index > len(server.turns):
             raise Exception("Turn index " + str(self.turn_index) + "is two " +
                             "or more turns into the future.")
         
-        turn = server.turns[self.turn_index]
-        turn_complete = True
-        for player in server.players:
-            turn_complete = turn_complete and turn.contains_player(player)
-
-        response_turn = turn if turn_complete else None
-        
-        response = TurnPollResponse(gameturn=response_turn,
+        response = TurnPollResponse(gameturn=completed_turn(server,
+                                                            self.turn_index),
                                     turn_index=self.turn_index)
         return response
     
@@ -136,3 +165,61 @@ class TurnPollResponse(Message):
     
     def message_type(self):
         return "messages.TurnPollResponse"
+
+'''
+the response is only sent once every player has reported the turn, so the
+client hears about it one round trip after the last report
+'''
+@dataclass(eq=False)
+class TurnSubscribeRequest(Message):
+    turn_index: int
+
+    def respond_on_server(self, server, reply):
+        check_turn_index(self.turn_index)
+        turn = completed_turn(server, self.turn_index)
+        if turn != None:
+            reply(TurnSubscribeResponse(gameturn=turn,
+                                        turn_index=self.turn_index))
+        else:
+            server.turn_subscribers.setdefault(self.turn_index,
+                                               []).append(reply)
+
+    def message_type(self):
+        return "messages.TurnSubscribeRequest"
+
+@dataclass(eq=False)
+class TurnSubscribeResponse(Message):
+    gameturn: gameplay.Gameturn
+    turn_index: int
+
+    def message_type(self):
+        return "messages.TurnSubscribeResponse"
+
+'''
+sent by the host instead of the response when handling a request raised;
+the clients' wait_for_response raise it
+'''
+@dataclass(eq=False)
+class ErrorResponse(Message):
+    error: str
+
+    def message_type(self):
+        return "messages.ErrorResponse"
+
+def turn_complete(server, turn):
+    return all(turn.contains_player(player) for player in server.players)
+
+'''
+the turn at turn_index once every player has reported it, otherwise None
+'''
+def completed_turn(server, turn_index):
+    if turn_index >= len(server.turns):
+        return None
+    turn = server.turns[turn_index]
+    if turn == None or not turn_complete(server, turn):
+        return None
+    return turn
+
+def check_turn_index(turn_index):
+    if turn_index < 0:
+        raise Exception("Turn index " + str(turn_index) + " is negative.")
@@ -2,50 +2,168 @@ import jsons
 import crochet
 
 from twisted.internet import reactor
+from twisted.internet.defer import Deferred, CancelledError
+from twisted.internet.protocol import Factory
 from twisted.protocols.basic import NetstringReceiver
-from twisted.internet.endpoints import TCP4ClientEndpoint, connectProtocol
+from twisted.internet.endpoints import TCP4ClientEndpoint
+from twisted.application.internet import ClientService, backoffPolicy
 
 from dataclasses import dataclass
 
 import game_io
 import gameplay
-import gameflow
 import messages
+import wire
+
+HOST = "18.215.153.187"
+PORT = 8007
+WIRE_FORMAT = "jsons" # see wire.WIRE_FORMATS
+RESPONSE_TIMEOUT = 30 # seconds
 
 class MessageProtocol(NetstringReceiver):
-    def __init__(self, request):
-        self.request = request
-        self.response = None
+    def __init__(self, connection):
+        self.connection = connection
     
-    def encodeAndSendString(self, string):
-        self.sendString(bytes(string, "utf-8"))
-
     def stringReceived(self, data):
-        self.stringDecoded(str(data, 'utf-8'))
+        response_container, response, wire_format = wire.decode_message(data)
+        self.connection.response_received(response_container.request_id,
+                                          response)
 
     def connectionMade(self):
-        self.encodeAndSendString(self.request)
+        self.connection.connected(self)
+
+    def connectionLost(self, reason):
+        self.connection.disconnected(self)
+
+class MessageProtocolFactory(Factory):
+    def __init__(self, connection):
+        self.connection = connection
+
+    def buildProtocol(self, addr):
+        return MessageProtocol(self.connection)
+
+class PendingRequest:
+    def __init__(self, request_id, request, canceller):
+        self.request_id = request_id
+        self.request = request # the encoded message
+        self.response = None
+        self.deferred = Deferred(canceller) # fires with the response
+
+    def resolve(self, response):
+        self.response = response
+        if isinstance(response, messages.ErrorResponse):
+            self.deferred.errback(Exception(
+                "The host could not handle the request: " + response.error))
+        else:
+            self.deferred.callback(response)
+
+class ServerConnection:
+    '''
+    One long-lived connection to the host shared by every request.  Requests
+    are tagged with a request id that the host echoes back, so any number
+    of them can be outstanding at once.  If the connection drops it is
+    reestablished with backoff, and requests still waiting for a response
+    are sent again.  Only use from the reactor thread.
+    '''
+    def __init__(self, host, port, wire_format=WIRE_FORMAT, match_id=None):
+        self.wire_format = wire_format
+        self.match_id = match_id # sent with every request
+        self.next_request_id = 0
+        self.pending_requests = dict() # request id to PendingRequest
+        self.protocol = None
+        endpoint = TCP4ClientEndpoint(reactor, host, port)
+        self.service = ClientService(endpoint,
+                                     MessageProtocolFactory(self),
+                                     retryPolicy=backoffPolicy(maxDelay=5))
+        self.service.startService()
+
+    def connected(self, protocol):
+        self.protocol = protocol
+        for pending_request in self.pending_requests.values():
+            protocol.sendString(pending_request.request)
 
-    def stringDecoded(self, string):
-        response_container = jsons.loads(string, cls=messages.MessageContainer)
-        self.response = jsons.loads(
-            response_container.message,
-            cls=response_container.message_type)
-        self.transport.loseConnection()
+    def disconnected(self, protocol):
+        if self.protocol == protocol:
+            self.protocol = None
+
+    def response_received(self, request_id, response):
+        pending_request = self.pending_requests.pop(request_id, None)
+        if pending_request != None:
+            pending_request.resolve(response)
+
+    def send(self, message):
+        request_id = self.next_request_id
+        self.next_request_id += 1
+        encoded_message = wire.encode_message(message,
+                                              request_id,
+                                              self.wire_format,
+                                              self.match_id)
+        pending_request = PendingRequest(
+            request_id,
+            encoded_message,
+            lambda deferred: self.pending_requests.pop(request_id, None))
+        self.pending_requests[request_id] = pending_request
+        if self.protocol != None:
+            self.protocol.sendString(encoded_message)
+        return pending_request
+
+    def close(self):
+        return self.service.stopService()
+
+connection = None
+
+'''
+set where the connection made on the first request goes
+'''
+def configure(host=HOST, port=PORT, wire_format=WIRE_FORMAT):
+    global HOST, PORT, WIRE_FORMAT
+    if connection != None:
+        raise Exception("Configure networking before sending any message.")
+    HOST = host
+    PORT = port
+    WIRE_FORMAT = wire_format
+
+def get_connection():
+    global connection
+    if connection == None:
+        connection = ServerConnection(HOST, PORT, WIRE_FORMAT)
+    return connection
 
+@crochet.wait_for(5)
+def join_match(match_id):
+    get_connection().match_id = match_id
+
+'''
+return a PendingRequest whose response is set once the host answers
+'''
 @crochet.wait_for(5)
 def send_message(message):
-    message_string = jsons.dumps(message)
-    message_container_string = jsons.dumps(
-        messages.MessageContainer(message=message_string,
-                         message_type=message.message_type()))
-    point = TCP4ClientEndpoint(reactor, "18.215.153.187", 8007)
-    message_protocol = MessageProtocol(message_container_string)
-    connectProtocol(point, message_protocol)
-    return message_protocol
-
-def wait_for_response(message):
-    message_protocol = send_message(message)
-    while (message_protocol.response == None):
-        pass
-    return message_protocol.response
+    pending_request = get_connection().send(message)
+    # callers read the response attribute, an ErrorResponse on errors
+    pending_request.deferred.addErrback(lambda failure: None)
+    return pending_request
+
+'''
+wait_for_response has already raised by the time it cancels a request
+'''
+def ignore_cancellation(failure):
+    failure.trap(CancelledError)
+
+@crochet.run_in_reactor
+def request_response(message):
+    return get_connection().send(message).deferred.addErrback(
+        ignore_cancellation)
+
+'''
+block until the host responds, without spinning; raise if the host answers
+with an ErrorResponse or no response arrives within timeout seconds
+'''
+def wait_for_response(message, timeout=RESPONSE_TIMEOUT):
+    eventual_result = request_response(message)
+    try:
+        return eventual_result.wait(timeout)
+    except crochet.TimeoutError:
+        eventual_result.cancel()
+        raise Exception("No response to " + message.message_type() +
+                        " from host " + HOST + ":" + str(PORT) + " within " +
+                        str(timeout) + " seconds.")
@@ -0,0 +1,180 @@
+import os
+import time
+import pickle
+import struct
+import tempfile
+
+from uuid import uuid4
+
+PLAYERS_PER_MATCH = 2 # arenas.first_arena seats two players
+HOT_TURNS = 100 # turns kept in memory per match, older ones are on disk
+MAX_IDLE_SECONDS = 3600 # matches without messages for this long are freed
+
+FRAME_HEADER = struct.Struct(">I")
+
+class TurnStore:
+    '''
+    The turns of one match, used like a list of turns, and its starting
+    gamestate.  Only the last hot_turns turns, and the starting gamestate
+    until hot_turns turns have been played, are kept in memory.  Older
+    entries are pickled to an append-only log, at path or in an anonymous
+    temporary file, and read back from it when asked for.
+    '''
+    def __init__(self, hot_turns=HOT_TURNS, path=None):
+        self.hot_turns = hot_turns
+        self.path = path
+        self.file = None
+        self.hot = dict() # index to entry
+        self.offsets = dict() # index to offset of its latest frame
+        self.length = 0
+        self.hot_starting_gamestate = None
+        self.starting_gamestate_offset = None # once spilled
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if not (0 <= index < self.length):
+            raise IndexError("Turn " + str(index) + " out of range.")
+        if index in self.hot:
+            return self.hot[index]
+        if index in self.offsets:
+            return self.read_frame(self.offsets[index])
+        return None
+
+    def __setitem__(self, index, entry):
+        if not (0 <= index < self.length):
+            raise IndexError("Turn " + str(index) + " out of range.")
+        self.hot[index] = entry
+        self.spill()
+
+    def append(self, entry):
+        self.length += 1
+        self[self.length-1] = entry
+
+    @property
+    def starting_gamestate(self):
+        if self.starting_gamestate_offset != None:
+            return self.read_frame(self.starting_gamestate_offset)
+        return self.hot_starting_gamestate
+
+    @starting_gamestate.setter
+    def starting_gamestate(self, gamestate):
+        self.hot_starting_gamestate = gamestate
+        self.starting_gamestate_offset = None
+        self.spill()
+
+    def spill(self):
+        oldest_hot = self.length - self.hot_turns
+        for index in [index for index in self.hot if index < oldest_hot]:
+            entry = self.hot.pop(index)
+            if entry != None:
+                self.offsets[index] = self.write_frame(entry)
+        if oldest_hot >= 0 and self.hot_starting_gamestate != None:
+            self.starting_gamestate_offset = self.write_frame(
+                self.hot_starting_gamestate)
+            self.hot_starting_gamestate = None
+
+    def read_frame(self, offset):
+        self.file.seek(offset)
+        length = FRAME_HEADER.unpack(self.file.read(FRAME_HEADER.size))[0]
+        return pickle.loads(self.file.read(length))
+
+    def write_frame(self, entry):
+        if self.file == None:
+            self.file = (open(self.path, "w+b") if self.path != None
+                         else tempfile.TemporaryFile())
+        offset = self.file.seek(0, 2)
+        data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        self.file.write(FRAME_HEADER.pack(len(data)))
+        self.file.write(data)
+        return offset
+
+    def close(self):
+        self.hot = dict()
+        self.offsets = dict()
+        self.hot_starting_gamestate = None
+        self.starting_gamestate_offset = None
+        if self.file != None:
+            self.file.close()
+            self.file = None
+
+class ServerState:
+    def __init__(self, match_id=None, hot_turns=HOT_TURNS, turn_log_path=None):
+        self.match_id = match_id
+        self.players = list()
+        # wire.EncodedGameturn, or None before any report
+        self.turns = TurnStore(hot_turns, turn_log_path)
+        self.turn_subscribers = dict() # turn index to reply callbacks
+        self.started = False
+        self.last_activity = time.time()
+
+    @property
+    def starting_gamestate(self):
+        return self.turns.starting_gamestate
+
+    @starting_gamestate.setter
+    def starting_gamestate(self, gamestate):
+        self.turns.starting_gamestate = gamestate
+        self.started = gamestate != None
+
+    def open_to_players(self):
+        return (not self.started and
+                len(self.players) < PLAYERS_PER_MATCH)
+
+    def close(self):
+        self.turns.close()
+        self.turn_subscribers = dict()
+
+class Lobby:
+    '''
+    Every match served by one host process, each with its own ServerState
+    keyed by match id.  Messages name their match in
+    MessageContainer.match_id, and a message naming no match goes to the
+    first match still open to players.  Only messages that open matches,
+    see Message.opens_match, create the match they name, or a new one if
+    they name none; for other messages a match missing from the lobby, one
+    never created or already freed, is an error.  Turn logs of spilled turns
+    go to turn_log_directory if given, under a name the host chooses, see
+    ServerState.turns.path, and to anonymous temporary files otherwise.
+    '''
+    def __init__(self, turn_log_directory=None, hot_turns=HOT_TURNS):
+        self.matches = dict() # match id to ServerState
+        self.turn_log_directory = turn_log_directory
+        self.hot_turns = hot_turns
+
+    def match(self, match_id, create=True):
+        if match_id == None:
+            for server in self.matches.values():
+                if server.open_to_players():
+                    return server
+            if not create:
+                raise Exception("No match is open to players.")
+            match_id = uuid4().hex
+        if match_id not in self.matches:
+            if not create:
+                raise Exception("No match " + str(match_id) + " on this " +
+                                "host; it may have been freed.")
+            # match ids come from clients, so the log is named by the host
+            path = None
+            if self.turn_log_directory != None:
+                path = os.path.join(self.turn_log_directory,
+                                    uuid4().hex + ".turns")
+            self.matches[match_id] = ServerState(match_id,
+                                                 self.hot_turns,
+                                                 path)
+        server = self.matches[match_id]
+        server.last_activity = time.time()
+        return server
+
+    '''
+    forget matches nobody has sent a message about for max_idle_seconds,
+    and return their match ids
+    '''
+    def free_idle_matches(self, max_idle_seconds=MAX_IDLE_SECONDS):
+        cutoff = time.time() - max_idle_seconds
+        idle = [match_id for match_id, server in self.matches.items()
+                if server.last_activity < cutoff]
+        for match_id in idle:
+            self.matches.pop(match_id).close()
+        return idle
@@ -0,0 +1,49 @@
+'''
+Tests of both gameboard backends, e.g.
+
+    python -m unittest test_gameboards
+'''
+import copy
+import unittest
+
+import gameplay
+import headless
+
+TEAMS = ["monsters_1", "test_team_1"]
+
+class PruneTransporterClonesTest(unittest.TestCase):
+    '''
+    a board decoded from the wire may hold a separate copy of a unit in each
+    square it covers; pruning leaves one object per unit
+    '''
+    def prune(self, board_name):
+        gameboard = headless.build_match(TEAMS,
+                                         0,
+                                         headless.BOARDS[board_name]).gameboard
+        units = sorted(gameboard.units(), key=lambda unit: int(unit.uuid))
+        unit = units[0]
+        clone_coords = gameplay.covered_squares(unit)[-1]
+        occupants = gameboard.squares[clone_coords]
+        occupants[occupants.index(unit)] = copy.deepcopy(unit)
+
+        gameboard.prune_transporter_clones()
+
+        self.assertEqual([int(unit.uuid) for unit in units],
+                         sorted(int(unit.uuid) for unit in gameboard.units()))
+        for unit in units:
+            kept = gameboard.get_by_uuid(unit.uuid)
+            for coords in gameplay.covered_squares(unit):
+                self.assertIs(gameboard.get_single_occupant(coords), kept)
+            for part in kept.parts:
+                self.assertIs(gameboard.get_by_uuid(part.uuid), part)
+        self.assertFalse(gameboard.conflicts_exist())
+
+    def test_dict_board(self):
+        self.prune("dict")
+
+    def test_array_board(self):
+        self.prune("array")
+
+
+if __name__ == '__main__':
+    unittest.main()
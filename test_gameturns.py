@@ -0,0 +1,54 @@
+'''
+Tests of turns received from the network, e.g.
+
+    python -m unittest test_gameturns
+'''
+import copy
+import unittest
+
+import gameplay
+import headless
+
+TEAMS = ["monsters_1", "test_team_1"]
+
+class AlignNetObjectsTest(unittest.TestCase):
+    '''
+    align_net_objects swaps the turn's copies of players, units and parts
+    for the gamestate's, and refuses turns naming the wrong kind of object
+    or another unit's parts
+    '''
+    def setUp(self):
+        self.gamestate = headless.build_match(TEAMS, 0)
+        self.player = self.gamestate.players[0]
+        self.unit, self.other_unit = sorted(
+            self.gamestate.gameboard.units(),
+            key=lambda unit: unit.owner_player_number)
+
+    def aligned(self, unit, part):
+        turn = gameplay.build_gameturn([self.player])
+        turn.add_action(copy.deepcopy(self.player),
+                        copy.deepcopy(unit),
+                        copy.deepcopy(part),
+                        gameplay.collector_action_factory())
+        turn.align_net_objects(self.gamestate)
+        return turn
+
+    def test_own_part(self):
+        part = self.unit.parts[0]
+        turn = self.aligned(self.unit, part)
+        unit_dict = turn.players_to_units_to_parts_to_actions[self.player]
+        self.assertIs(list(unit_dict)[0], self.unit)
+        self.assertIs(list(unit_dict[self.unit])[0], part)
+
+    def test_other_units_part(self):
+        with self.assertRaises(Exception):
+            self.aligned(self.unit, self.other_unit.parts[0])
+
+    def test_part_as_unit(self):
+        part = self.unit.parts[0]
+        with self.assertRaises(Exception):
+            self.aligned(part, part)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+'''
+Replay regression test for the turn resolver.  replays.json.gz holds
+matches recorded with headless.random_turn, each starting from
+headless.build_match for its teams and seed: every turn, as a
+gameplay.GameturnReference in the codec.py encoding, and a fingerprint of
+the gamestate after every turn as the original resolver left it.  The test
+replays the recorded turns on every board backend and checks every
+fingerprint, e.g.
+
+    python -m unittest test_replay
+
+Matches are only recorded again, with
+
+    python test_replay.py --record
+
+when resolver behaviour is meant to change.
+'''
+import os
+import sys
+import gzip
+import json
+import base64
+import random
+import hashlib
+import argparse
+import unittest
+
+import gameplay
+import codec
+import headless
+
+REPLAY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "replays.json.gz")
+# seeds whose matches see units destroyed within RECORDED_TURNS
+RECORDED_MATCHES = [(["monsters_1", "test_team_1"], seed) for seed in [0, 3]]
+RECORDED_TURNS = 330
+
+'''
+everything a turn can change, as a hex digest: players' resources and
+research, and every square's occupants with their parts
+'''
+def fingerprint(gamestate):
+    state = []
+    for player in gamestate.players:
+        state.append((str(player.uuid),
+                      repr(player.resource_amount),
+                      repr(player.research_amount)))
+    for coords in sorted(gamestate.gameboard.squares):
+        for placeable in gamestate.gameboard.squares[coords]:
+            entry = [coords, type(placeable).__name__, placeable.coords]
+            if placeable.is_resource_pile():
+                entry.append(repr(placeable.amount))
+            if placeable.is_unit():
+                entry.append(str(placeable.uuid))
+                for part in placeable.parts:
+                    under_production = getattr(part, "under_production", None)
+                    entry.append((str(part.uuid),
+                                  repr(part.damage),
+                                  repr(getattr(part, "current_energy", None)),
+                                  repr(getattr(part,
+                                               "current_production_points",
+                                               None)),
+                                  None if under_production == None
+                                  else under_production.unit_name))
+            state.append(entry)
+    return hashlib.sha256(repr(state).encode("utf-8")).hexdigest()
+
+def encode(value):
+    return base64.b64encode(bytes(codec.encode(value))).decode("ascii")
+
+def decode(string):
+    return codec.decode(base64.b64decode(string))[0]
+
+def record_match(team_names, seed, turns):
+    gamestate = headless.build_match(team_names, seed)
+    match = {"teams": team_names,
+             "seed": seed,
+             "turns": [],
+             "fingerprints": []}
+    rng = random.Random(seed)
+    for i in range(turns):
+        turn = gameplay.merge_turns([headless.random_turn(gamestate,
+                                                          player,
+                                                          rng)
+                                     for player in gamestate.players])
+        match["turns"].append(encode(gameplay.turn_to_reference(turn)))
+        gameplay.advance_gamestate_via_mutation(gamestate, turn)
+        match["fingerprints"].append(fingerprint(gamestate))
+    return match
+
+def load_matches():
+    with gzip.open(REPLAY_PATH, "rt") as file:
+        return json.load(file)
+
+class ReplayTest(unittest.TestCase):
+    def replay(self, board_name):
+        for match in load_matches():
+            gamestate = headless.build_match(match["teams"],
+                                             match["seed"],
+                                             headless.BOARDS[board_name])
+            for turn_index, (turn, expected) in enumerate(
+                    zip(match["turns"], match["fingerprints"])):
+                gameplay.advance_gamestate_via_mutation(
+                    gamestate,
+                    gameplay.turn_from_reference(decode(turn)))
+                self.assertEqual(
+                    fingerprint(gamestate),
+                    expected,
+                    "%s seed %d on the %s board differs after turn %d" %
+                    (" vs ".join(match["teams"]), match["seed"], board_name,
+                     turn_index))
+
+    def test_dict_board(self):
+        self.replay("dict")
+
+    def test_array_board(self):
+        self.replay("array")
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description="Replay recorded matches.")
+    parser.add_argument("--record", action="store_true",
+                        help="record the matches again with this resolver")
+    options, remaining = parser.parse_known_args(arguments)
+    if not options.record:
+        unittest.main(argv=[sys.argv[0]] + remaining)
+        return
+    matches = [record_match(team_names, seed, RECORDED_TURNS)
+               for team_names, seed in RECORDED_MATCHES]
+    with open(REPLAY_PATH, "wb") as file:
+        file.write(gzip.compress(json.dumps(matches).encode("utf-8"),
+                                 mtime=0))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,72 @@
+'''
+Tests of the host's match state, e.g.
+
+    python -m unittest test_server_state
+'''
+import os
+import tempfile
+import unittest
+
+import messages
+import server_state
+import wire
+
+class LobbyTest(unittest.TestCase):
+    def test_turn_logs_stay_in_their_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            lobby = server_state.Lobby(directory, hot_turns=1)
+            for match_id in ["../../x", os.path.join(directory, "x"), "x"]:
+                server = lobby.match(match_id)
+                for i in range(3):
+                    server.turns.append(i)
+                self.assertEqual(os.path.dirname(server.turns.path),
+                                 directory)
+                server.close()
+            self.assertEqual(len(os.listdir(directory)), 3)
+            self.assertFalse(os.path.exists(os.path.join(directory, "x")))
+
+    def test_unknown_match(self):
+        lobby = server_state.Lobby()
+        with self.assertRaises(Exception):
+            lobby.match("x", create=False)
+        server = lobby.match("x")
+        self.assertIs(lobby.match("x", create=False), server)
+
+class TurnStoreTest(unittest.TestCase):
+    def test_starting_gamestate_spills(self):
+        turns = server_state.TurnStore(hot_turns=2)
+        turns.starting_gamestate = "start"
+        for i in range(5):
+            turns.append(i)
+            self.assertEqual(turns.starting_gamestate, "start")
+        self.assertIsNone(turns.hot_starting_gamestate)
+        self.assertEqual([turns[i] for i in range(5)], list(range(5)))
+        for index in [-1, 5]:
+            with self.assertRaises(IndexError):
+                turns[index]
+        turns.close()
+
+class TurnIndexTest(unittest.TestCase):
+    '''
+    negative turn indices are refused instead of reaching the starting
+    gamestate or the end of the turn list
+    '''
+    def test_negative_turn_index(self):
+        server = server_state.ServerState("x")
+        server.starting_gamestate = "start"
+        requests = [messages.ReportTurnRequest(
+                        gameturn=wire.EncodedGameturn(dict()),
+                        turn_index=-1),
+                    messages.TurnPollRequest(turn_index=-1),
+                    messages.TurnSubscribeRequest(turn_index=-1)]
+        for request in requests:
+            with self.assertRaises(Exception):
+                request.respond_on_server(server, lambda response: None)
+        self.assertEqual(server.starting_gamestate, "start")
+        self.assertEqual(len(server.turns), 0)
+        self.assertEqual(server.turn_subscribers, dict())
+        server.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
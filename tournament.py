@@ -0,0 +1,150 @@
+'''
+Round-robin tournament between every team under teams/, played headless
+across a process pool, e.g.
+
+    python tournament.py --matches 4 --turns 500 --workers 8
+'''
+import os
+import sys
+import copy
+import time
+import argparse
+import itertools
+
+from concurrent.futures import ProcessPoolExecutor
+
+import game_io
+import headless
+
+
+# team name to loaded player, filled once per worker process
+worker_teams = dict()
+
+def load_worker_teams(team_names):
+    for team_name in team_names:
+        worker_teams[team_name] = game_io.player_from_team(team_name)
+
+def cached_team(team_name):
+    return copy.deepcopy(worker_teams[team_name])
+
+def play_match(job):
+    team_names, seed, max_turns, generator_name, board_name = job
+    gamestate = headless.build_match(team_names,
+                                     seed,
+                                     headless.BOARDS[board_name],
+                                     cached_team)
+    generator = headless.TURN_GENERATORS[generator_name]
+    result = headless.run_match(gamestate,
+                                [generator, generator],
+                                max_turns,
+                                seed)
+    return (team_names, result)
+
+'''
+every ordered pair of different teams plays matches_per_seating matches,
+so each pairing is played from both starting positions
+'''
+def schedule(team_names, matches_per_seating, max_turns, generator_name,
+             board_name, seed):
+    jobs = []
+    for seating in itertools.permutations(team_names, 2):
+        for match in range(matches_per_seating):
+            jobs.append((seating, seed + len(jobs), max_turns,
+                         generator_name, board_name))
+    return jobs
+
+
+class PairingStats:
+    def __init__(self):
+        self.wins = [0, 0]
+        self.draws = 0
+        self.resources = [0.0, 0.0]
+        self.units = [0, 0]
+        self.turns = 0
+        self.matches = 0
+
+    '''
+    add a result, with first_team being the pairing's first team whichever
+    seat it played from
+    '''
+    def add(self, result, first_team_seat):
+        seats = [first_team_seat, 3 - first_team_seat]
+        self.matches += 1
+        self.turns += result.turns
+        for index, seat in enumerate(seats):
+            if result.winner_player_number == seat:
+                self.wins[index] += 1
+            self.resources[index] += result.resource_amounts[seat]
+            self.units[index] += result.unit_counts[seat]
+        if result.winner_player_number == None:
+            self.draws += 1
+
+def aggregate(results):
+    pairings = dict()
+    for team_names, result in results:
+        pairing = tuple(sorted(team_names))
+        stats = pairings.setdefault(pairing, PairingStats())
+        stats.add(result, team_names.index(pairing[0]) + 1)
+    return pairings
+
+def print_table(pairings):
+    header = ("%-16s %-16s %5s %5s %5s %10s %10s %8s %8s %7s" %
+              ("team A", "team B", "A win", "B win", "draw",
+               "A res", "B res", "A units", "B units", "turns"))
+    print(header)
+    print("-" * len(header))
+    for (team_a, team_b), stats in sorted(pairings.items()):
+        matches = stats.matches
+        print("%-16s %-16s %5d %5d %5d %10.1f %10.1f %8.1f %8.1f %7.1f" %
+              (team_a, team_b, stats.wins[0], stats.wins[1], stats.draws,
+               stats.resources[0] / matches, stats.resources[1] / matches,
+               stats.units[0] / matches, stats.units[1] / matches,
+               stats.turns / matches))
+
+    totals = dict()
+    for (team_a, team_b), stats in pairings.items():
+        for index, team in enumerate([team_a, team_b]):
+            record = totals.setdefault(team, [0, 0, 0])
+            record[0] += stats.wins[index]
+            record[1] += stats.wins[1 - index]
+            record[2] += stats.draws
+    print()
+    print("%-16s %5s %5s %5s" % ("team", "won", "lost", "drawn"))
+    for team, (won, lost, drawn) in sorted(totals.items(),
+                                           key=lambda item: -item[1][0]):
+        print("%-16s %5d %5d %5d" % (team, won, lost, drawn))
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description="Run a team tournament.")
+    parser.add_argument("--matches", type=int, default=2,
+                        help="matches per pairing and seating")
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--generator", default="random",
+                        choices=sorted(headless.TURN_GENERATORS))
+    parser.add_argument("--board", default="dict",
+                        choices=sorted(headless.BOARDS))
+    options = parser.parse_args(arguments)
+
+    team_names = sorted(os.listdir("teams"))
+    jobs = schedule(team_names, options.matches, options.turns,
+                    options.generator, options.board, options.seed)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=options.workers,
+                             initializer=load_worker_teams,
+                             initargs=(team_names,)) as executor:
+        results = list(executor.map(play_match, jobs))
+    seconds = time.perf_counter() - start
+
+    print_table(aggregate(results))
+    turns = sum(result.turns for team_names, result in results)
+    print()
+    print("%d matches, %d turns in %.1f seconds on %d workers "
+          "(%.1f turns/second)" % (len(results), turns, seconds,
+                                   options.workers, turns / seconds))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,201 @@
+'''
+Encoding of messages for the wire, shared by the Twisted and asyncio
+transports so both put the same bytes on the wire.  Every message is sent
+as a netstring, b"<length>:<data>,", holding either
+
+    jsons:   a jsons encoded MessageContainer wrapping the jsons encoded
+             message, or
+    binary:  BINARY_MAGIC, the container fields other than message and
+             message_type, then the message in the codec.py encoding.
+
+The format is chosen per connection by the client, and the host answers
+each message in the format it arrived in.  In both formats a Gameturn is
+sent as each of its players' gameplay.GameturnReference, encoded separately,
+see EncodedGameturn.
+'''
+from dataclasses import fields
+from typing import get_type_hints
+from uuid import UUID
+
+import jsons
+
+import codec
+import gameplay
+import messages
+
+BINARY_MAGIC = b"\x00" # jsons containers always start with "{"
+WIRE_FORMATS = ["jsons", "binary"]
+
+# container fields carried alongside a binary message
+BINARY_CONTAINER_FIELDS = [field.name for field
+                           in fields(messages.MessageContainer)
+                           if field.name not in ["message", "message_type"]]
+container_hints = get_type_hints(messages.MessageContainer)
+container_codecs = [(name,
+                     codec.writer_for(container_hints[name]),
+                     codec.reader_for(container_hints[name]))
+                    for name in BINARY_CONTAINER_FIELDS]
+
+class EncodedGameturn:
+    '''
+    A turn as the host handles it: each player's part of the turn stays
+    encoded, as the player's GameturnReference in the wire format it arrived
+    in, so the host stores, merges and relays turns without decoding their
+    actions.  The encoding of the whole turn is cached per wire format, so a
+    completed turn is encoded once however many clients ask for it.
+    '''
+    def __init__(self, chunks):
+        self.chunks = chunks # player uuid to (wire format, encoded turn)
+        self.encodings = dict() # wire format to encoding of the whole turn
+
+    @staticmethod
+    def from_gameturn(gameturn, wire_format):
+        chunks = dict()
+        for player, unit_dict in gameturn.players_to_units_to_parts_to_actions.items():
+            player_turn = gameplay.build_gameturn([player])
+            player_turn[player] = unit_dict
+            chunks[player.uuid] = (wire_format,
+                                   encode_reference(
+                                       gameplay.turn_to_reference(player_turn),
+                                       wire_format))
+        return EncodedGameturn(chunks)
+
+    def contains_player(self, player):
+        return player.uuid in self.chunks
+
+    '''
+    later turns overwrite a player's part of earlier ones, like merge_turns
+    '''
+    def merged(self, other):
+        chunks = dict(self.chunks)
+        chunks.update(other.chunks)
+        return EncodedGameturn(chunks)
+
+    def chunk(self, player_uuid, wire_format):
+        chunk_format, data = self.chunks[player_uuid]
+        if chunk_format == wire_format:
+            return data
+        return encode_reference(decode_reference(data, chunk_format),
+                                wire_format)
+
+    def decode(self):
+        return gameplay.merge_turns(
+            [gameplay.turn_from_reference(decode_reference(data, wire_format))
+             for wire_format, data in self.chunks.values()])
+
+    def binary_encoding(self):
+        if "binary" not in self.encodings:
+            out = bytearray()
+            codec.write_int(len(self.chunks), out)
+            for player_uuid in self.chunks:
+                data = self.chunk(player_uuid, "binary")
+                codec.write_uuid(player_uuid, out)
+                codec.write_int(len(data), out)
+                out += data
+            self.encodings["binary"] = bytes(out)
+        return self.encodings["binary"]
+
+    def jsons_encoding(self):
+        if "jsons" not in self.encodings:
+            self.encodings["jsons"] = [
+                {"player_uuid": str(player_uuid),
+                 "turn": self.chunk(player_uuid, "jsons")}
+                for player_uuid in self.chunks]
+        return self.encodings["jsons"]
+
+def encode_reference(reference, wire_format):
+    if wire_format == "binary":
+        return bytes(codec.encode(reference))
+    return jsons.dumps(reference, strip_privates=True)
+
+def decode_reference(data, wire_format):
+    if wire_format == "binary":
+        return codec.decode(data)[0]
+    return jsons.loads(data, cls=gameplay.GameturnReference)
+
+def as_encoded_turn(gameturn, wire_format):
+    if isinstance(gameturn, EncodedGameturn):
+        return gameturn
+    return EncodedGameturn.from_gameturn(gameturn, wire_format)
+
+def write_turn(gameturn, out):
+    out += as_encoded_turn(gameturn, "binary").binary_encoding()
+
+def read_turn(data, offset):
+    count, offset = codec.read_int(data, offset)
+    chunks = dict()
+    for i in range(count):
+        player_uuid, offset = codec.read_uuid(data, offset)
+        length, offset = codec.read_int(data, offset)
+        chunks[player_uuid] = ("binary", bytes(data[offset:offset+length]))
+        offset += length
+    return (EncodedGameturn(chunks), offset)
+
+def serialize_turn(gameturn, **kwargs):
+    return as_encoded_turn(gameturn, "jsons").jsons_encoding()
+
+def deserialize_turn(obj, cls, **kwargs):
+    return EncodedGameturn({UUID(chunk["player_uuid"]): ("jsons", chunk["turn"])
+                            for chunk in obj})
+
+for turn_class in [gameplay.Gameturn, EncodedGameturn]:
+    codec.encode_with(turn_class, gameplay.Gameturn, write_turn, read_turn)
+    jsons.set_serializer(serialize_turn, turn_class)
+jsons.set_deserializer(deserialize_turn, gameplay.Gameturn)
+
+
+def encode_message(message,
+                   request_id=None,
+                   wire_format="jsons",
+                   match_id=None):
+    if wire_format == "binary":
+        out = bytearray(BINARY_MAGIC)
+        container_values = {"request_id": request_id, "match_id": match_id}
+        for name, writer, reader in container_codecs:
+            writer(container_values.get(name, None), out)
+        codec.encode(message, out)
+        return bytes(out)
+    if wire_format == "jsons":
+        message_string = jsons.dumps(message, strip_privates=True)
+        return bytes(jsons.dumps(messages.MessageContainer(
+            message=message_string,
+            message_type=message.message_type(),
+            request_id=request_id,
+            match_id=match_id)), "utf-8")
+    raise Exception("Unknown wire format " + str(wire_format) + ".")
+
+def wire_format_of(data):
+    return "binary" if data[:1] == BINARY_MAGIC else "jsons"
+
+'''
+return (container, message, wire format) for an encoded message; binary
+containers have an empty message string.  Turns in the message are decoded
+to Gameturns unless decode_turns is False, when they are left as
+EncodedGameturns for the host.
+'''
+def decode_message(data, decode_turns=True):
+    wire_format = wire_format_of(data)
+    if wire_format == "binary":
+        view = memoryview(data)
+        offset = len(BINARY_MAGIC)
+        values = dict()
+        for name, writer, reader in container_codecs:
+            values[name], offset = reader(view, offset)
+        message = codec.decode(view, offset)[0]
+        container = messages.MessageContainer(
+            message="",
+            message_type=message.message_type(),
+            **values)
+    else:
+        string = str(data, "utf-8")
+        container = jsons.loads(string, cls=messages.MessageContainer)
+        message = jsons.loads(container.message, cls=container.message_type)
+    if decode_turns:
+        for field in fields(message):
+            value = getattr(message, field.name)
+            if isinstance(value, EncodedGameturn):
+                setattr(message, field.name, value.decode())
+    return (container, message, wire_format)
+
+def netstring(data):
+    return str(len(data)).encode("ascii") + b":" + data + b","